@@ -1,3 +1,5 @@
+import pygame
+
 from yazelc import config as cfg
 from yazelc import zesper
 from yazelc.components import Position, Renderable
@@ -11,11 +13,13 @@ class Camera:
 
     def __init__(self, x_pos: int, y_pos: int, max_x: int = cfg.RESOLUTION.x, max_y: int = cfg.RESOLUTION.y):
         self.pos = Position(x_pos, y_pos)
+        self.prev_pos = self.pos
         self.max_pos = Position(max_x, max_y)
         self.offset = Position(max_x, max_y)
         self.ent_id_to_track = None
 
     def update(self, world: zesper.World):
+        self.prev_pos = self.pos  # A still camera is not interpolated from where it was on an older update
         if self.ent_id_to_track:
             entity_followed_pos = world.component_for_entity(self.ent_id_to_track, Position)
 
@@ -26,6 +30,12 @@ class Camera:
             self.pos.x = min(self.max_pos.x - cfg.RESOLUTION.x, self.pos.x)
             self.pos.y = min(self.max_pos.y - cfg.RESOLUTION.y, self.pos.y)
 
+    def interpolated_pos(self, interpolation: float) -> pygame.Vector2:
+        """ Position between the one before the last update and the current one """
+        if interpolation >= 1:
+            return self.pos
+        return pygame.Vector2(self.prev_pos).lerp(self.pos, interpolation)
+
     def track_entity(self, ent_id: int, world: zesper.World):
         self.ent_id_to_track = ent_id
         self.offset = self._get_position_of_entity_to_track(ent_id, world)
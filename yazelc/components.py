@@ -1,6 +1,7 @@
-from dataclasses import dataclass as component
-from dataclasses import field, InitVar
-from enum import Enum, auto
+import math
+from dataclasses import dataclass, field, InitVar
+from enum import Enum, IntFlag, auto
+from functools import partial
 
 import pygame
 
@@ -11,6 +12,9 @@ from yazelc.tween import TweenFunction
 from yazelc.utils.game_utils import Direction, Status, IVec
 from yazelc.utils.timer import Timer
 
+# Components are slotted: no per instance dictionary, which makes them smaller and their attribute access faster
+component = partial(dataclass, slots=True)
+
 
 class Position(pygame.Vector2):
     """
@@ -18,6 +22,7 @@ class Position(pygame.Vector2):
     flag is on. This one is used for entities that should be on the screen no matter where the
     camera is positioned
     """
+    __slots__ = ('absolute', 'prev_x', 'prev_y')
 
     def __init__(self, x: float = 0, y: float = 0, absolute: bool = False):
         super().__init__(x, y)
@@ -36,6 +41,16 @@ class Position(pygame.Vector2):
         self.prev_y = self.y
         super().update(x, y)
 
+    def reset(self, x: float, y: float):
+        """ Places the position without a previous one, e.g., when the entity is recycled """
+        super().update(x, y)
+        self.prev_x = x
+        self.prev_y = y
+
+    def correct(self, x: float, y: float):
+        """ Places the position within the current step, i.e., keeping the previous one (e.g., out of a wall) """
+        super().update(x, y)
+
     @classmethod
     def on_screen_center(cls, surface: pygame.Surface, absolute: bool = False):
         """ Returns the Position to which the surface is centered on the screen"""
@@ -52,10 +67,12 @@ class Position(pygame.Vector2):
 
 
 class Velocity(Position):
+    __slots__ = ()
     ZERO_THRESHOLD = 1e-3
 
 
-class Acceleration(Velocity): pass
+class Acceleration(Velocity):
+    __slots__ = ()
 
 
 @component
@@ -158,6 +175,26 @@ class Health:
         self.cooldown_timer = Timer(cooldown_time)
 
 
+class CollisionLayer(IntFlag):
+    """
+    Categories of hitboxes. Each hitbox has a category and a mask with the categories it can collide with. Two penetrable
+    hitboxes are only tested for collision when the category of each one is on the mask of the other one
+    """
+    NONE = 0
+    DEFAULT = auto()  # Hitboxes with no explicit category. Every mask should include it
+    WALL = auto()
+    PLAYER = auto()
+    PLAYER_WEAPON = auto()
+    INTERACTOR = auto()
+    ENEMY = auto()
+    ENEMY_WEAPON = auto()
+    BOMB = auto()
+    ITEM = auto()
+    SIGN = auto()
+    DOOR = auto()
+    ALL = DEFAULT | WALL | PLAYER | PLAYER_WEAPON | INTERACTOR | ENEMY | ENEMY_WEAPON | BOMB | ITEM | SIGN | DOOR
+
+
 class HitBox(pygame.Rect):
     """
     Pygame is made such that hitboxes contain also a position. Therefore, is difficult to separate the components, i.e.,
@@ -167,14 +204,24 @@ class HitBox(pygame.Rect):
 
     In addition to the regular bounding hitbox we can optionally specify a "skin depth" which will define two additional
     hitboxes. These are used to implement the "soft corner collision" seen in games like Zelda: A Link to the Past.
+
+    The category and mask (see CollisionLayer) are stored as plain integers to keep the bitwise checks cheap
+
+    Continuous hitboxes are swept along their displacement against the walls instead of only being tested at their final
+    position, such that fast movers (e.g. projectiles) do not tunnel through thin walls
     """
+    __slots__ = ('impenetrable', 'continuous', 'skin_depth', 'destroy_on_contact', 'category', 'mask', 'corner_rects')
 
     def __init__(self, x_pos: int, y_pos: int, width: int, height: int, impenetrable: bool = False, skin_depth: int = 0,
-                 destroy_on_contact: bool = False):
+                 destroy_on_contact: bool = False, category: int = CollisionLayer.DEFAULT, mask: int = CollisionLayer.ALL,
+                 continuous: bool = False):
         super().__init__(x_pos, y_pos, width, height)
         self.impenetrable = impenetrable
+        self.continuous = continuous
         self.skin_depth = skin_depth
         self.destroy_on_contact = destroy_on_contact
+        self.category = int(category)
+        self.mask = int(mask)
         self.corner_rects: list[pygame.Rect] = []
         if self.skin_depth:
             self.corner_rects = [pygame.Rect(0, 0, skin_depth, skin_depth) for _ in range(4)]
@@ -184,6 +231,9 @@ class HitBox(pygame.Rect):
         """ NOTE: This is not creating a "moved" copy of the original HitBox object """
         new_hitbox = super().move(x, y)
         new_hitbox.impenetrable = self.impenetrable
+        new_hitbox.category = self.category
+        new_hitbox.mask = self.mask
+        new_hitbox.continuous = self.continuous
         new_hitbox.skin_depth = 0  # Do not copy skin information as this will make the
         new_hitbox.corner_rects = None
         return new_hitbox  # noqa  C implementation of pygame.Rect is aware that we are subclassing
@@ -194,6 +244,21 @@ class HitBox(pygame.Rect):
         for corner_r in self.corner_rects:
             corner_r.move_ip(x, y)
 
+    def time_of_impact(self, delta_x: int, delta_y: int, walls: list[pygame.Rect]) -> tuple[float, int]:
+        """
+        Sweeps the hitbox from its current position along the displacement against the walls. Returns the fraction of
+        the displacement done before touching the first wall and the axis of the hit (0 for x and 1 for y). If no wall
+        is hit the fraction is 1 and the axis -1. Walls already overlapping the hitbox are ignored
+        """
+        first_fraction, first_axis = 1.0, -1
+        for wall in walls:
+            entry_x, exit_x = _slab_times(self.left, self.right, wall.left, wall.right, delta_x)
+            entry_y, exit_y = _slab_times(self.top, self.bottom, wall.top, wall.bottom, delta_y)
+            entry = max(entry_x, entry_y)
+            if 0 <= entry < first_fraction and entry < min(exit_x, exit_y) and wall.width and wall.height:
+                first_fraction, first_axis = entry, 0 if entry_x >= entry_y else 1
+        return first_fraction, first_axis
+
     def collides_with_corner_points(self, rect: pygame.Rect) -> int:
         point_list = [
             [sum(ele) for ele in zip(self.corner_rects[0].topright, (-1, -1))],
@@ -225,6 +290,92 @@ class HitBox(pygame.Rect):
         self.corner_rects[3].topright = self.topright
 
 
+def _slab_times(min_1: int, max_1: int, min_2: int, max_2: int, delta: int) -> tuple[float, float]:
+    """ Fractions of the displacement of the first interval at which it starts and stops overlapping the second one """
+    if delta > 0:
+        return (min_2 - max_1) / delta, (max_2 - min_1) / delta
+    elif delta < 0:
+        return (max_2 - min_1) / delta, (min_2 - max_1) / delta
+    elif min_1 < max_2 and min_2 < max_1:
+        return -math.inf, math.inf
+    else:
+        return math.inf, -math.inf
+
+
+class CollisionBitmap:
+    """
+    Per tile collision data of a map, i.e., a grid indexed by tile coordinates telling if a tile is solid.
+
+    Each cell of the bytearray is zero for a free tile or the index (plus one) of the tile shape in the shapes list. A
+    shape is the tuple of collider boxes, relative to the tile origin, of the tile: normally a single one, but stacked
+    tile layers add up their colliders on the same tile. Walls are found by looking up only the few tiles touched by a
+    rectangle, so the cost of a query does not depend on the size of the map. It also offers a cheap walkability check
+    for AI or tools
+    """
+    __slots__ = ('width', 'height', 'tile_width', 'tile_height', 'cells', 'shapes')
+    MAX_SHAPES = 255
+
+    def __init__(self, width: int, height: int, tile_width: int, tile_height: int):
+        self.width = width  # in tiles
+        self.height = height
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.cells = bytearray(width * height)
+        self.shapes: list[tuple[pygame.Rect, ...]] = []
+
+    def set_collider(self, tile_x: int, tile_y: int, collider: pygame.Rect):
+        """ Adds the collider box (relative to the tile origin) to the ones the tile already has, if any """
+        cell = tile_y * self.width + tile_x
+        shape = self.shapes[self.cells[cell] - 1] if self.cells[cell] else ()
+        if collider not in shape:
+            shape += (pygame.Rect(collider),)
+        if shape not in self.shapes:
+            if len(self.shapes) == self.MAX_SHAPES:
+                raise RuntimeError(f'Collision bitmap supports only up to {self.MAX_SHAPES} different tile shapes')
+            self.shapes.append(shape)
+        self.cells[cell] = self.shapes.index(shape) + 1
+
+    def is_blocked(self, tile_x: int, tile_y: int) -> bool:
+        """ Whether the tile has a collider. Tiles outside the map are not blocked """
+        if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
+            return self.cells[tile_y * self.width + tile_x] != 0
+        return False
+
+    def is_walkable(self, x_pos: int, y_pos: int) -> bool:
+        """ Whether the absolute point lies on the map and outside any tile collider """
+        tile_x, tile_y = x_pos // self.tile_width, y_pos // self.tile_height
+        if not (0 <= tile_x < self.width and 0 <= tile_y < self.height):
+            return False
+        shape_idx = self.cells[tile_y * self.width + tile_x]
+        if not shape_idx:
+            return True
+        point = (x_pos - tile_x * self.tile_width, y_pos - tile_y * self.tile_height)
+        return not any(collider.collidepoint(point) for collider in self.shapes[shape_idx - 1])
+
+    def colliding_rects(self, rect: pygame.Rect) -> list[pygame.Rect]:
+        """ Absolute collider boxes of the tiles overlapping the rect """
+        tile_x_min = max(0, rect.left // self.tile_width)
+        tile_y_min = max(0, rect.top // self.tile_height)
+        tile_x_max = min(self.width - 1, (rect.right - 1) // self.tile_width)
+        tile_y_max = min(self.height - 1, (rect.bottom - 1) // self.tile_height)
+
+        colliders = []
+        for tile_y in range(tile_y_min, tile_y_max + 1):
+            row_offset = tile_y * self.width
+            for tile_x in range(tile_x_min, tile_x_max + 1):
+                if shape_idx := self.cells[row_offset + tile_x]:
+                    for tile_collider in self.shapes[shape_idx - 1]:
+                        collider = tile_collider.move(tile_x * self.tile_width, tile_y * self.tile_height)
+                        if collider.colliderect(rect):
+                            colliders.append(collider)
+        return colliders
+
+    def all_colliding_rects(self) -> list[pygame.Rect]:
+        """ Absolute collider boxes of all the blocked tiles """
+        return [collider.move((idx % self.width) * self.tile_width, (idx // self.width) * self.tile_height)
+                for idx, shape_idx in enumerate(self.cells) if shape_idx for collider in self.shapes[shape_idx - 1]]
+
+
 @component
 class Brain:
     """ Brain given to an NPC character / Enemy AI"""
@@ -7,7 +7,14 @@ from yazelc.utils.game_utils import IVec
 
 RESOLUTION = IVec(272, 240)
 TILE_WIDTH = 16
-DEBUG_MODE = False
+DEBUG_MODE = False  # Renders the hitboxes and profiles the processors (shown on an overlay)
+TILE_COLLISION_BITMAP = True  # Resolve walls of the map tiles with tile lookups instead of hitboxes
+MERGE_TILE_COLLIDERS = True  # Coalesce adjacent tile colliders into bigger hitboxes. Unused with TILE_COLLISION_BITMAP
+BATCH_WALL_COLLISIONS = True  # Test the moving hitboxes against their nearby walls at once with NumPy (if installed)
+FIXED_TIMESTEP = False  # Simulate at SIMULATION_FPS independently of the display rate and interpolate the rendering
+SIMULATION_FPS = 60
+MAX_STEPS_PER_FRAME = 5  # Simulation steps due beyond these are dropped (the game slows down)
+DIRTY_RECT_RENDERING = False  # Only redraw (and present) the screen regions that changed while the camera is still
 
 C_BLACK = pygame.Color(0, 0, 0)
 C_WHITE = pygame.Color(255, 255, 255)
@@ -23,9 +23,14 @@ def create_text_box(dialog_entity_id: int, dialog: cmp.Dialog, world: zesper.Wor
     dialog.idle = False
     dialog.index = 0
 
-    background = _create_surface_background()
-    world.add_component(dialog_entity_id, cmp.Renderable(image=background, depth=SURFACE_DEPTH))
-    world.add_component(dialog_entity_id, cmp.Position(menu_pos_x, menu_pos_y, absolute=True))
+    if world.has_component(dialog_entity_id, cmp.Renderable):  # Box disabled when the dialog was closed the last time
+        world.component_for_entity(dialog_entity_id, cmp.Renderable).image.fill(cfg.C_BLACK)
+        world.enable_component(dialog_entity_id, cmp.Renderable)
+        world.enable_component(dialog_entity_id, cmp.Position)
+    else:
+        background = _create_surface_background()
+        world.add_component(dialog_entity_id, cmp.Renderable(image=background, depth=SURFACE_DEPTH))
+        world.add_component(dialog_entity_id, cmp.Position(menu_pos_x, menu_pos_y, absolute=True))
 
 
 def add_triangle_signal(dialog_entity_id: int, world: zesper.World, color: pygame.Color = cfg.C_WHITE):
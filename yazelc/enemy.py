@@ -11,43 +11,57 @@ KEFER_ID = 'kefer'
 KEFER_SPRITE_WIDTH = 16
 KEFER_ANIMATION_DELAY = 10
 
+COLLISION_MASK = (cmp.CollisionLayer.PLAYER | cmp.CollisionLayer.PLAYER_WEAPON | cmp.CollisionLayer.BOMB |
+                  cmp.CollisionLayer.DEFAULT)
+
 
 def create_enemy_at(x_pos: int, y_pos: int, world: zesper.World, enemy_type: int) -> int:
+    return world.create_entity(*enemy_components(x_pos, y_pos, world, enemy_type))
+
+
+def create_jelly_at(x_pos: int, y_pos: int, world: zesper.World) -> int:
+    return world.create_entity(*jelly_components(x_pos, y_pos, world))
+
+
+def create_kefer_at(x_pos: int, y_pos: int, world: zesper.World) -> int:
+    return world.create_entity(*kefer_components(x_pos, y_pos, world))
+
+
+def enemy_components(x_pos: int, y_pos: int, world: zesper.World, enemy_type: int) -> tuple:
+    """ Prefab of the enemies, e.g., to create all the ones of a map with World.create_entities_from_prefab """
     if enemy_type == 0:
-        return create_jelly_at(x_pos, y_pos, world)
+        return jelly_components(x_pos, y_pos, world)
     elif enemy_type == 1:
-        return create_kefer_at(x_pos, y_pos, world)
+        return kefer_components(x_pos, y_pos, world)
     else:
         raise RuntimeError(f'Unknown enemy type id {enemy_type}')
 
 
-def create_jelly_at(x_pos: int, y_pos: int, world: zesper.World) -> int:
-    enemy_entity = world.create_entity()
-    world.add_component(enemy_entity, cmp.Brain(think_frames=50))
-    world.add_component(enemy_entity, cmp.Velocity())
-    world.add_component(enemy_entity, cmp.Health())
-    world.add_component(enemy_entity, cmp.Weapon(damage=1, active_frames=-1, freeze_frames=7, recoil_velocity=3))
-    world.add_component(enemy_entity, cmp.HitBox(x_pos, y_pos, JELLY_SPRITE_WIDTH, JELLY_SPRITE_WIDTH))
-    world.add_component(enemy_entity, cmp.Position(x=x_pos, y=y_pos))
-    world.add_component(enemy_entity, cmp.Enemy(JELLY_ID))
-    world.add_component(enemy_entity, cmp.State(Status.IDLE, Direction.DOWN))
+def jelly_components(x_pos: int, y_pos: int, world: zesper.World) -> tuple:
     image_strip = world.resource_manager.get_animation_strip('jelly_idle_down')
-    world.add_component(enemy_entity, cmp.Animation.from_delay(image_strip, JELLY_ANIMATION_DELAY))
-    world.add_component(enemy_entity, cmp.Renderable(image=image_strip[0]))
-    return enemy_entity
+    return (cmp.Brain(think_frames=50),
+            cmp.Velocity(),
+            cmp.Health(),
+            cmp.Weapon(damage=1, active_frames=-1, freeze_frames=7, recoil_velocity=3),
+            cmp.HitBox(x_pos, y_pos, JELLY_SPRITE_WIDTH, JELLY_SPRITE_WIDTH, category=cmp.CollisionLayer.ENEMY,
+                       mask=COLLISION_MASK),
+            cmp.Position(x=x_pos, y=y_pos),
+            cmp.Enemy(JELLY_ID),
+            cmp.State(Status.IDLE, Direction.DOWN),
+            cmp.Animation.from_delay(image_strip, JELLY_ANIMATION_DELAY),
+            cmp.Renderable(image=image_strip[0]))
 
 
-def create_kefer_at(x_pos: int, y_pos: int, world: zesper.World) -> int:
-    enemy_entity = world.create_entity()
-    world.add_component(enemy_entity, cmp.Brain(think_frames=50, behaviour_type=1))
-    world.add_component(enemy_entity, cmp.Velocity())
-    world.add_component(enemy_entity, cmp.Health())
-    world.add_component(enemy_entity, cmp.Weapon(damage=1, active_frames=-1, freeze_frames=7, recoil_velocity=3))
-    world.add_component(enemy_entity, cmp.HitBox(x_pos, y_pos, JELLY_SPRITE_WIDTH, JELLY_SPRITE_WIDTH))
-    world.add_component(enemy_entity, cmp.Position(x=x_pos, y=y_pos))
-    world.add_component(enemy_entity, cmp.Enemy(KEFER_ID))
-    world.add_component(enemy_entity, cmp.State(Status.IDLE, Direction.DOWN))
+def kefer_components(x_pos: int, y_pos: int, world: zesper.World) -> tuple:
     image_strip = world.resource_manager.get_animation_strip('kefer_idle_down')
-    world.add_component(enemy_entity, cmp.Animation.from_delay(image_strip, KEFER_ANIMATION_DELAY))
-    world.add_component(enemy_entity, cmp.Renderable(image=image_strip[0]))
-    return enemy_entity
+    return (cmp.Brain(think_frames=50, behaviour_type=1),
+            cmp.Velocity(),
+            cmp.Health(),
+            cmp.Weapon(damage=1, active_frames=-1, freeze_frames=7, recoil_velocity=3),
+            cmp.HitBox(x_pos, y_pos, JELLY_SPRITE_WIDTH, JELLY_SPRITE_WIDTH, category=cmp.CollisionLayer.ENEMY,
+                       mask=COLLISION_MASK),
+            cmp.Position(x=x_pos, y=y_pos),
+            cmp.Enemy(KEFER_ID),
+            cmp.State(Status.IDLE, Direction.DOWN),
+            cmp.Animation.from_delay(image_strip, KEFER_ANIMATION_DELAY),
+            cmp.Renderable(image=image_strip[0]))
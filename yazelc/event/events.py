@@ -70,6 +70,22 @@ class RestartEvent:
 
 @eventclass
 class CollisionEvent:
+    """ Sent when two penetrable hitboxes start to overlap """
+    ent_1: int
+    ent_2: int
+
+
+@eventclass
+class CollisionStayEvent:
+    """ Sent periodically while two penetrable hitboxes keep overlapping """
+    ent_1: int
+    ent_2: int
+    frames: int  # Frames since the contact started
+
+
+@eventclass
+class CollisionExitEvent:
+    """ Sent when two penetrable hitboxes stop overlapping (or one of them is removed) """
     ent_1: int
     ent_2: int
 
@@ -18,15 +18,22 @@ class CollectableItemType(Enum):
 
 
 def create_entity(item_type: CollectableItemType, pos_x: int, pos_y: int, world: zesper.World) -> int:
-    ent_id = world.create_entity()
+    return world.create_entity(*item_components(item_type, pos_x, pos_y, world))
+
+
+def item_components(item_type: CollectableItemType, pos_x: int, pos_y: int, world: zesper.World) -> tuple:
     images = get_images(world, item_type)
+    components = []
     if len(images) > 1:
-        world.add_component(ent_id, cmp.Animation.from_delay(images, COIN_ANIMATION_FRAME_DELAY))  # TODO: only works for coins now
-    world.add_component(ent_id, cmp.Renderable(images[0]))
-    world.add_component(ent_id, cmp.Position(pos_x, pos_y))
-    world.add_component(ent_id, cmp.Collectable(item_type))
-    world.add_component(ent_id, cmp.HitBox(pos_x, pos_y, images[0].get_width(), images[0].get_height()))
-    return ent_id
+        components.append(cmp.Animation.from_delay(images, COIN_ANIMATION_FRAME_DELAY))  # TODO: only works for coins now
+    # Items can only be picked up by the player or its interactor
+    mask = cmp.CollisionLayer.PLAYER | cmp.CollisionLayer.INTERACTOR | cmp.CollisionLayer.DEFAULT
+    components.extend((cmp.Renderable(images[0]),
+                       cmp.Position(pos_x, pos_y),
+                       cmp.Collectable(item_type),
+                       cmp.HitBox(pos_x, pos_y, images[0].get_width(), images[0].get_height(),
+                                  category=cmp.CollisionLayer.ITEM, mask=mask)))
+    return tuple(components)
 
 
 def get_images(world: zesper.World, item_type: CollectableItemType) -> list[pygame.Surface]:
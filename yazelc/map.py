@@ -12,6 +12,7 @@ import pygame
 from pytmx import TiledTileLayer, TiledMap, util_pygame, TiledObjectGroup
 
 from yazelc import components as cmp
+from yazelc import config as cfg
 from yazelc.font import Font
 from yazelc.items import CollectableItemType
 from yazelc.resource_manager import ResourceManager
@@ -80,6 +81,9 @@ class Map:
     TEXT_PROPERTY = 'text'
     ITEM_PROPERTY = 'item'
     FOREGROUND_LAYER_DEPTH = 1000
+    SIGN_COLLISION_MASK = cmp.CollisionLayer.INTERACTOR | cmp.CollisionLayer.DEFAULT
+    CHEST_COLLISION_MASK = cmp.CollisionLayer.PLAYER | cmp.CollisionLayer.INTERACTOR | cmp.CollisionLayer.DEFAULT
+    DOOR_COLLISION_MASK = cmp.CollisionLayer.PLAYER | cmp.CollisionLayer.DEFAULT
     GROUND_LEVEL_DEPTH = 0
 
     def __init__(self, map_file_path: Path, resource_manager: ResourceManager):
@@ -121,45 +125,84 @@ class Map:
                 f'No foreground layer named {self.FOREGROUND_LAYER_NAME} found for the map {self.map_file_path}')
             return [(self.GROUND_LEVEL_DEPTH, map_image)]
 
-    def create_colliders(self) -> Iterator[tuple]:
-        for layer_no, layer in enumerate(self.tmx_data.layers):
+    def create_wall_components(self, collision_bitmap: bool = cfg.TILE_COLLISION_BITMAP,
+                               merge: bool = cfg.MERGE_TILE_COLLIDERS) -> list[tuple]:
+        """
+        Components of all the walls of the map. With the collision bitmap the tile colliders are only on the bitmap, so
+        merging them does not apply
+        """
+        wall_components = [(self.create_collision_bitmap(),)] if collision_bitmap else []
+        wall_components.extend(self.create_colliders(merge=merge, include_tiles=not collision_bitmap))
+        return wall_components
+
+    def create_colliders(self, merge: bool = False, include_tiles: bool = True) -> Iterator[tuple]:
+        """
+        If merge is set, the colliders of the tile layers are coalesced into maximal rectangles before the hitboxes
+        are created, e.g., a solid wall of 40 tiles gives a single hitbox instead of 40. The tile colliders can be left
+        out when they are handled instead by the collision bitmap (see create_collision_bitmap)
+        """
+        for layer in self.tmx_data.layers:
             if layer.name.lower() == self.FOREGROUND_LAYER_NAME:
                 continue
-            if isinstance(layer, TiledTileLayer):
-                for x, y, _, in layer.tiles():
-                    properties = self.tmx_data.get_tile_properties(x, y, layer_no)
-                    if properties and 'colliders' in properties:
-                        collider = properties['colliders'][0]  # Assume tile has a single collider box
-                        hit_box = cmp.HitBox(x * self.tmx_data.tilewidth + collider.x,
-                                             y * self.tmx_data.tileheight + collider.y, collider.width, collider.height,
-                                             impenetrable=True)
-                        yield (hit_box,)
-            elif isinstance(layer, TiledObjectGroup):
+            if isinstance(layer, TiledObjectGroup):
                 for obj in layer:
                     if obj.image and hasattr(obj, 'properties') and 'colliders' in obj.properties:
                         collider = obj.properties['colliders'][0]  # Assume tile has a single collider box
                         hit_box = cmp.HitBox(obj.x + collider.x,
                                              obj.y + collider.y, collider.width, collider.height,
-                                             impenetrable=True)
+                                             impenetrable=True, category=cmp.CollisionLayer.WALL)
                         yield (hit_box,)
-            else:
+            elif not isinstance(layer, TiledTileLayer):
                 logging.debug(f'Ignoring {str(layer)} layer type ')
 
+        if not include_tiles:
+            return
+        tile_colliders = [collider.move(x * self.tmx_data.tilewidth, y * self.tmx_data.tileheight)
+                          for x, y, collider in self._get_tile_colliders()]
+        if merge:
+            n_tile_colliders = len(tile_colliders)
+            tile_colliders = merge_rects(tile_colliders)
+            logging.info(f'Merged {n_tile_colliders} tile colliders into {len(tile_colliders)} for the map {self.map_file_path}')
+        for rect in tile_colliders:
+            yield (cmp.HitBox(rect.x, rect.y, rect.width, rect.height, impenetrable=True, category=cmp.CollisionLayer.WALL),)
+
+    def create_collision_bitmap(self) -> cmp.CollisionBitmap:
+        """ Collision bitmap of the tile layers indexed by tile coordinates """
+        bitmap = cmp.CollisionBitmap(self.tmx_data.width, self.tmx_data.height, self.tmx_data.tilewidth,
+                                     self.tmx_data.tileheight)
+        for x, y, collider in self._get_tile_colliders():
+            bitmap.set_collider(x, y, collider)
+        return bitmap
+
+    def _get_tile_colliders(self) -> Iterator[tuple[int, int, pygame.Rect]]:
+        """ Tile coordinates and the collider box (relative to the tile) of all colliding tiles """
+        for layer_no, layer in enumerate(self.tmx_data.layers):
+            if layer.name.lower() == self.FOREGROUND_LAYER_NAME or not isinstance(layer, TiledTileLayer):
+                continue
+            for x, y, _, in layer.tiles():
+                properties = self.tmx_data.get_tile_properties(x, y, layer_no)
+                if properties and 'colliders' in properties:
+                    collider = properties['colliders'][0]  # Assume tile has a single collider box
+                    yield x, y, pygame.Rect(collider.x, collider.y, collider.width, collider.height)
+
     def create_interactive_objects(self, font: Font) -> Iterator[tuple]:
         if self.INTERACTIVE_OBJECT_LAYER_NAME not in self.tmx_data.layernames:
             logging.info(f'No {self.INTERACTIVE_OBJECT_LAYER_NAME} layer found for the map {self.map_file_path}')
             return
         for obj in self.tmx_data.get_layer_by_name(self.INTERACTIVE_OBJECT_LAYER_NAME):
-            hit_box = cmp.HitBox(obj.x, obj.y, obj.width, obj.height, impenetrable=False)
             position = cmp.Position(obj.x, obj.y)
             if self.TEXT_PROPERTY in obj.properties:
                 if obj.properties[self.TEXT_PROPERTY] is None:
                     logging.error('Sign has no dialog')
+                hit_box = cmp.HitBox(obj.x, obj.y, obj.width, obj.height, impenetrable=False,
+                                     category=cmp.CollisionLayer.SIGN, mask=self.SIGN_COLLISION_MASK)
                 dialog = cmp.Dialog(obj.properties[self.TEXT_PROPERTY], font)
                 components = (hit_box, dialog)
                 yield components
             elif self.ITEM_PROPERTY in obj.properties:
                 # TODO: Default value of all chested items
+                hit_box = cmp.HitBox(obj.x, obj.y, obj.width, obj.height, impenetrable=False,
+                                     category=cmp.CollisionLayer.ITEM, mask=self.CHEST_COLLISION_MASK)
                 collectable = cmp.Collectable(CollectableItemType(obj.properties[self.ITEM_PROPERTY]), 1, in_chest=True)
                 components = (hit_box, collectable, position)
                 yield components
@@ -173,7 +216,8 @@ class Map:
             target_y = obj.properties[self.DOOR_TARGET_Y_STR]
             map_image_sub_path = obj.properties[self.DOOR_TARGET_STR].split(self.DOOR_PATH_SEP)
             target_door = Path(self.DATA_PATH, *map_image_sub_path)
-            hit_box = cmp.HitBox(obj.x, obj.y, obj.width, obj.height, impenetrable=False)
+            hit_box = cmp.HitBox(obj.x, obj.y, obj.width, obj.height, impenetrable=False,
+                                 category=cmp.CollisionLayer.DOOR, mask=self.DOOR_COLLISION_MASK)
             door = cmp.Door(target_door, target_x, target_y)
             yield door, hit_box
 
@@ -237,3 +281,34 @@ class Map:
             return tile
 
         return load_image
+
+
+def merge_rects(rects: list[pygame.Rect]) -> list[pygame.Rect]:
+    """
+    Greedily coalesces adjacent and aligned rectangles into bigger ones covering exactly the same area.
+
+    First the rectangles sharing the same vertical extent are joined into horizontal runs when they touch or overlap.
+    Then the runs sharing the same horizontal extent are joined vertically in the same way
+    """
+    runs = _merge_along_axis(rects, lambda r: (r.top, r.height), lambda r: (r.left, r.right))
+    return _merge_along_axis(runs, lambda r: (r.left, r.width), lambda r: (r.top, r.bottom))
+
+
+def _merge_along_axis(rects: list[pygame.Rect], group_key, extent) -> list[pygame.Rect]:
+    groups: dict[tuple[int, int], list[pygame.Rect]] = {}
+    for rect in rects:
+        groups.setdefault(group_key(rect), []).append(rect)
+
+    merged_rects = []
+    for group in groups.values():
+        group.sort(key=extent)
+        current = group[0].copy()
+        for rect in group[1:]:
+            start, end = extent(rect)
+            if start <= extent(current)[1]:
+                current.union_ip(rect)
+            else:
+                merged_rects.append(current)
+                current = rect.copy()
+        merged_rects.append(current)
+    return merged_rects
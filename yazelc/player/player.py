@@ -2,6 +2,8 @@
 The module gathers functions that add commonly used entities to an input world
 """
 
+import pygame
+
 from yazelc import components as cmp
 from yazelc import config as cfg
 from yazelc import weapons
@@ -40,6 +42,11 @@ SWORD_SOUND_EFFECT = 'slash'
 INTERACTIVE_FRONT_RANGE = 10
 INTERACTIVE_SIDE_RANGE = 2
 
+COLLISION_MASK = (cmp.CollisionLayer.ENEMY | cmp.CollisionLayer.ENEMY_WEAPON | cmp.CollisionLayer.BOMB |
+                  cmp.CollisionLayer.ITEM | cmp.CollisionLayer.DOOR | cmp.CollisionLayer.DEFAULT)
+SWORD_COLLISION_MASK = cmp.CollisionLayer.ENEMY | cmp.CollisionLayer.DEFAULT
+INTERACTIVE_COLLISION_MASK = cmp.CollisionLayer.SIGN | cmp.CollisionLayer.ITEM | cmp.CollisionLayer.DEFAULT
+
 
 
 def create_player_at(center_x_pos: int, center_y_pos: int, world: zesper.World) -> int:
@@ -52,7 +59,8 @@ def create_player_at(center_x_pos: int, center_y_pos: int, world: zesper.World)
     # world.add_component(player_entity_id, cmp.Animation(stripe[:1], delay=IDLE_ANIMATION_FRAME))
 
     # HitBox
-    hitbox_component = cmp.HitBox(0, 0, HITBOX_WIDTH, HITBOX_HEIGHT, skin_depth=SKIN_DEPTH)
+    hitbox_component = cmp.HitBox(0, 0, HITBOX_WIDTH, HITBOX_HEIGHT, skin_depth=SKIN_DEPTH,
+                                  category=cmp.CollisionLayer.PLAYER, mask=COLLISION_MASK)
     hitbox_component.center = (center_x_pos, center_y_pos)
     world.add_component(player_entity_id, hitbox_component)
 
@@ -94,36 +102,14 @@ def drop_bomb(player_entity_id: int, world: zesper.World):
 
 def create_melee_weapon(player_entity_id: int, world: zesper.World):
     """ Creates a Weapon hitbox for the parent entity with a hitbox """
-
-    weapon_entity_id = world.create_entity()
-
-    hitbox = _create_hitbox_in_front(player_entity_id, SWORD_FRONT_RANGE, SWORD_SIDE_RANGE, world)
-    world.add_component(weapon_entity_id, hitbox)
-
-    # world.add_component(hitbox_entity_id, hitbox)
-    world.add_component(weapon_entity_id,
-                        cmp.Weapon(damage=SWORD_DAMAGE, active_frames=SWORD_ACTIVE_FRAMES, freeze_frames=SWORD_FREEZE_FRAMES,
-                                   recoil_velocity=SWORD_RECOIL_VEL))
-
-    direction = world.component_for_entity(player_entity_id, cmp.State).direction
-    strip = world.resource_manager.get_animation_strip(f'wooden_sword_{direction.name}')
-    world.add_component(weapon_entity_id, cmp.Animation.from_delay(strip, ATTACK_ANIMATION_DELAY, one_loop=True))
-    world.add_component(weapon_entity_id, cmp.Renderable(strip[0], SPRITE_DEPTH + 1))
-    player_position = world.component_for_entity(player_entity_id, cmp.Position)
-    weapon_position_x = player_position.x - (SWORD_SPRITE_WIDTH - SPRITE_SIZE) // 2
-    weapon_position_y = player_position.y - (SWORD_SPRITE_WIDTH - SPRITE_SIZE) // 2
-    world.add_component(weapon_entity_id, cmp.Position(weapon_position_x, weapon_position_y))
+    weapon_pool = world.get_entity_pool('melee_weapon', _new_melee_weapon, _reset_melee_weapon)
+    weapon_pool.spawn(player_entity_id, world)
 
 
 def create_interactive_hitbox(player_entity_id: int, world: zesper.World):
     """ Creates a hitbox to detect interaction with other objects """
-
-    entity_id = world.create_entity()
-
-    hitbox = _create_hitbox_in_front(player_entity_id, INTERACTIVE_FRONT_RANGE, INTERACTIVE_SIDE_RANGE, world)
-
-    world.add_component(entity_id, hitbox)
-    world.add_component(entity_id, cmp.InteractorTag())
+    hitbox_pool = world.get_entity_pool('interactive_hitbox', _new_interactive_hitbox, _reset_interactive_hitbox)
+    entity_id = hitbox_pool.spawn(player_entity_id, world)
     world.event_queue.add(DeleteEntityEvent(entity_id), frames_delay=1)
 
 
@@ -214,26 +200,77 @@ def handle_input(input_event: InputEvent, player_entity_id: int, world: zesper.W
 
     elif input_event.controller.is_button_pressed(Button.SELECT):
         cfg.DEBUG_MODE = not cfg.DEBUG_MODE
+        if cfg.DEBUG_MODE:
+            world.enable_profiling()
+        else:
+            world.disable_profiling()
 
     if state.has_changed():
         handle_animation_for_input(player_entity_id, state, world)
 
 
-def _create_hitbox_in_front(player_entity_id: int, front_range: int, side_range: int,
-                            world: zesper.World) -> cmp.HitBox:
+def _new_melee_weapon(player_entity_id: int, world: zesper.World) -> tuple:
+    hitbox = cmp.HitBox(0, 0, 0, 0, category=cmp.CollisionLayer.PLAYER_WEAPON, mask=SWORD_COLLISION_MASK)
+    weapon = cmp.Weapon(damage=SWORD_DAMAGE, active_frames=SWORD_ACTIVE_FRAMES, freeze_frames=SWORD_FREEZE_FRAMES,
+                        recoil_velocity=SWORD_RECOIL_VEL)
+    strip = _get_sword_strip(player_entity_id, world)
+    components = (hitbox, weapon, cmp.Animation.from_delay(strip, ATTACK_ANIMATION_DELAY, one_loop=True),
+                  cmp.Renderable(strip[0], SPRITE_DEPTH + 1), cmp.Position())
+    _reset_melee_weapon(components, player_entity_id, world)
+    return components
+
+
+def _reset_melee_weapon(components: tuple, player_entity_id: int, world: zesper.World):
+    hitbox, weapon, animation, renderable, position = components
+    _place_hitbox_in_front(hitbox, player_entity_id, SWORD_FRONT_RANGE, SWORD_SIDE_RANGE, world)
+    weapon.active_timer.reset()
+
+    animation.strip = _get_sword_strip(player_entity_id, world)
+    animation.frame_counter = 0
+    animation.index = 0
+    renderable.image = animation.strip[0]
+
+    player_position = world.component_for_entity(player_entity_id, cmp.Position)
+    position.reset(player_position.x - (SWORD_SPRITE_WIDTH - SPRITE_SIZE) // 2,
+                   player_position.y - (SWORD_SPRITE_WIDTH - SPRITE_SIZE) // 2)
+
+
+def _get_sword_strip(player_entity_id: int, world: zesper.World) -> list[pygame.Surface]:
+    direction = world.component_for_entity(player_entity_id, cmp.State).direction
+    return world.resource_manager.get_animation_strip(f'wooden_sword_{direction.name}')
+
+
+def _new_interactive_hitbox(player_entity_id: int, world: zesper.World) -> tuple:
+    hitbox = _create_hitbox_in_front(player_entity_id, INTERACTIVE_FRONT_RANGE, INTERACTIVE_SIDE_RANGE, world,
+                                     cmp.CollisionLayer.INTERACTOR, INTERACTIVE_COLLISION_MASK)
+    return hitbox, cmp.InteractorTag()
+
+
+def _reset_interactive_hitbox(components: tuple, player_entity_id: int, world: zesper.World):
+    _place_hitbox_in_front(components[0], player_entity_id, INTERACTIVE_FRONT_RANGE, INTERACTIVE_SIDE_RANGE, world)
+
+
+def _create_hitbox_in_front(player_entity_id: int, front_range: int, side_range: int, world: zesper.World,
+                            category: int = cmp.CollisionLayer.DEFAULT, mask: int = cmp.CollisionLayer.ALL) -> cmp.HitBox:
     """ Creates a hitbox in the direction the player is facing """
+    hitbox = cmp.HitBox(0, 0, 0, 0, category=category, mask=mask)
+    _place_hitbox_in_front(hitbox, player_entity_id, front_range, side_range, world)
+    return hitbox
+
+
+def _place_hitbox_in_front(hitbox: cmp.HitBox, player_entity_id: int, front_range: int, side_range: int,
+                           world: zesper.World):
+    """ Resizes and moves the hitbox in front of the player in the direction it is facing """
     direction = world.component_for_entity(player_entity_id, cmp.State).direction
     player_hitbox = world.component_for_entity(player_entity_id, cmp.HitBox)
 
     if direction in (Direction.LEFT, Direction.RIGHT):
-        hitbox = cmp.HitBox(0, 0, front_range, side_range)
+        hitbox.size = (front_range, side_range)
         hitbox.x = player_hitbox.x + (
                     (player_hitbox.w - front_range) + (player_hitbox.w + front_range) * (direction.value.x)) // 2
         hitbox.y = player_hitbox.y + (player_hitbox.h - side_range) // 2
     else:
-        hitbox = cmp.HitBox(0, 0, side_range, front_range)
+        hitbox.size = (side_range, front_range)
         hitbox.x = player_hitbox.x + (player_hitbox.w - side_range) // 2
         hitbox.y = player_hitbox.y + (
                     (player_hitbox.h - front_range) + (player_hitbox.h + front_range) * (direction.value.y)) // 2
-
-    return hitbox
@@ -5,6 +5,7 @@ import pygame
 
 from event.events import InputEvent, ChangeSceneEvent
 from yazelc import zesper
+from yazelc.components import Position
 from yazelc.controller import Controller
 from yazelc.event.event_manager import EventManager
 from yazelc.event.event_queue import EventQueue
@@ -35,6 +36,19 @@ class BaseScene(abc.ABC):
         self._process_event_queue()
         self.world.process()
 
+    def step(self):
+        """
+        Advances the simulation by one fixed step without rendering it. Every position starts the step where it ended the
+        last one, such that the ones not moved by any system (e.g., while paused) are not rendered between stale positions
+        """
+        for _, position in self.world.get_component(Position, include_disabled=True):
+            position.prev_x, position.prev_y = position.x, position.y
+        self._process_event_queue()
+        self.world.simulate()
+
+    def render(self, interpolation: float):
+        self.world.render(interpolation)
+
     @abc.abstractmethod
     def on_exit(self):
         pass
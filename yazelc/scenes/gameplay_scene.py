@@ -90,6 +90,8 @@ class GameplayScene(BaseScene):
         self._load_resources()
         self._generate_map()
         self._generate_objects()
+        if cfg.DEBUG_MODE:
+            self.world.enable_profiling()
 
         if self.music_path:
             pygame.mixer.music.load(self.music_path)
@@ -107,7 +109,7 @@ class GameplayScene(BaseScene):
             hitbox = self.world.component_for_entity(self.player_entity_id, cmp.HitBox)
             velocity.x, velocity.y = (0, 0)
             hitbox.center = (player_x_pos, player_y_pos)
-            position.x, position.y = player.get_position_of_sprite(hitbox)
+            position.reset(*player.get_position_of_sprite(hitbox))
 
         # Add camera entity
         self.camera = Camera(0, 0, self.map.width, self.map.height)
@@ -118,9 +120,9 @@ class GameplayScene(BaseScene):
         hud_entity_id = hud.create_hud_entity(self.world, health_points)
 
         # Create a pickable item
-        for idx in range(3):
-            x_pos, y_pos = self.map.get_center_coord_from_tile(7 + idx, 17)
-            items.create_entity(CollectableItemType.COIN, x_pos, y_pos, self.world)
+        coin_rows = [(CollectableItemType.COIN, *self.map.get_center_coord_from_tile(7 + idx, 17), self.world)
+                     for idx in range(3)]
+        self.world.create_entities_from_prefab(items.item_components, coin_rows)
         # items.create_entity(items.PickableItemType.HEART, 300, 355, self.world)
         # items.create_entity(items.PickableItemType.HEART, 350, 355, self.world)
         inventory = {collectable_type: 0 for collectable_type in CollectableItemType}
@@ -212,27 +214,24 @@ class GameplayScene(BaseScene):
 
         self.map = Map(self.map_data_file, self.world.resource_manager)
 
-        for depth, map_layer in self.map.get_map_images():
-            layer_entity_id = self.world.create_entity()
-            self.world.add_component(layer_entity_id, cmp.Position(x=x_pos, y=y_pos))
-            self.world.add_component(layer_entity_id, cmp.Renderable(image=map_layer, depth=depth))
-            self.map.layer_entities.append(layer_entity_id)
+        layer_components = [(cmp.Position(x=x_pos, y=y_pos), cmp.Renderable(image=map_layer, depth=depth))
+                            for depth, map_layer in self.map.get_map_images()]
+        self.map.layer_entities.extend(self.world.create_entities(layer_components))
 
     def _generate_objects(self):
+        """ All the objects of the map are created in bulk """
         dialog_font = self.world.resource_manager.get_font(dialog_box.DIALOG_FONT_ID)
-        for components in self.map.create_colliders():
-            ent_id = self.world.create_entity(*components)
-            self.map.object_entities.append(ent_id)
-        for components in self.map.create_interactive_objects(dialog_font):
-            ent_id = self.world.create_entity(*components)
-            self.map.object_entities.append(ent_id)
-        for door, hitbox in self.map.create_doors():
-            ent_id = self.world.create_entity(door, hitbox)
-            self.map.object_entities.append(ent_id)
-        for pos_x, pos_y, enemy_type in self.map.create_enemies():
-            ent_id = enemy.create_enemy_at(pos_x, pos_y, self.world,
-                                           enemy_type)  # TODO: Generalize for any type of enemy
-            self.map.object_entities.append(ent_id)
+        object_components = self.map.create_wall_components()
+        object_components.extend(self.map.create_interactive_objects(dialog_font))
+        object_components.extend(self.map.create_doors())
+        object_components.extend(enemy.enemy_components(pos_x, pos_y, self.world, enemy_type)  # TODO: Generalize for any type of enemy
+                                 for pos_x, pos_y, enemy_type in self.map.create_enemies())
+        self.map.object_entities.extend(self.world.create_entities(object_components))
+
+    def step(self):
+        if self.camera is not None:  # The camera system is not run while paused or on transitions
+            self.camera.prev_pos = self.camera.pos
+        super().step()
 
     def on_exit(self):
         if type(self.next_scene) == type(self) and self.next_scene != self:  # Why do we make this check?
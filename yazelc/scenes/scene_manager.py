@@ -1,14 +1,39 @@
 """ This is the finite State Machine manager """
+import logging
 
+from yazelc import config as cfg
 from yazelc.scenes.base_scene import BaseScene
+from yazelc.utils.fixed_timestep import FixedTimestep
 
 
-def run_game_loop(initial_scene: BaseScene):
+def run_game_loop(initial_scene: BaseScene, fixed_timestep: bool = cfg.FIXED_TIMESTEP):
+    """
+    Without a fixed timestep the scene is updated once per displayed frame (as fast as vsync allows). Otherwise, the
+    simulation runs at a fixed rate and the rendering is interpolated between the last two steps
+    """
+    clock = FixedTimestep(cfg.SIMULATION_FPS, cfg.MAX_STEPS_PER_FRAME) if fixed_timestep else None
     current_scene = initial_scene
     while current_scene is not None:
         current_scene.on_enter()
+        if clock is not None:
+            clock.restart()
         while not current_scene.finished:
-            current_scene.update()
+            if clock is None:
+                current_scene.update()
+            else:
+                _run_frame(current_scene, clock)
         current_scene.on_exit()
         current_scene.event_manager.remove_all_handlers()  # TODO: Should this part of the scene code?
         current_scene = current_scene.next_scene
+
+    if clock is not None:
+        logging.info(f'Fixed timestep: {clock.caught_up_steps} steps caught up and {clock.dropped_steps} dropped')
+
+
+def _run_frame(scene: BaseScene, clock: FixedTimestep):
+    """ Runs the simulation steps due and renders the scene unless it finished in the meantime """
+    for _ in range(clock.tick()):
+        scene.step()
+        if scene.finished:
+            return
+    scene.render(clock.interpolation)
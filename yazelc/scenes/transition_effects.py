@@ -45,7 +45,7 @@ def closing_circle(player_entity_id: int, camera: Camera, world: zesper.World):
     pygame.draw.circle(cover_surface, cfg.C_WHITE, (position.x - camera.pos.x, position.y - camera.pos.y), radius)
     renderable = cmp.Renderable(image=cover_surface, depth=6000)
     world.add_component(effect_id, renderable)
-    world.add_component(effect_id, cmp.Position(camera.pos.x, camera.pos.y))
+    world.add_component(effect_id, cmp.Position(0, 0, absolute=True))  # Drawn on in place, so always redrawn
 
     frames_to_exit = TOTAL_EXIT_FRAMES
     while frames_to_exit > 0:
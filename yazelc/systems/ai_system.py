@@ -4,28 +4,32 @@ import pygame
 
 from yazelc import config
 from yazelc import zesper
-from yazelc.components import Brain, State, Velocity, Animation, Enemy, Position, Weapon, HitBox, Renderable
+from yazelc.components import Brain, State, Velocity, Animation, Enemy, Position, Weapon, HitBox, Renderable, CollisionLayer
 from yazelc.event.events import EnemyDecisionEvent
 from yazelc.utils.game_utils import Direction, Status
 
 
 class AISystem(zesper.Processor):
+    """ Brains are only updated every other frame (half of the enemies on each frame) """
+    PROJECTILE_COLLISION_MASK = CollisionLayer.PLAYER | CollisionLayer.DEFAULT
+    slices = 2
 
     def process(self):
-        for ent, (brain, state) in self.world.get_components(Brain, State):
+        elapsed_frames = self.frames_per_run
+        for ent, (brain, state) in self.sliced(self.world.get_components(Brain, State)):
             state.update()
 
             if brain.block_timer.is_set():
                 if brain.block_timer.has_finished():
                     brain.block_timer.set(0)
                     brain.timer.end()
-                brain.block_timer.tick()
+                brain.block_timer.tick(elapsed_frames)
 
             if brain.timer.has_finished() and not brain.block_timer.is_set():
                 brain.timer.reset()
                 self.world.event_queue.add(EnemyDecisionEvent(ent, brain.behaviour_type))
 
-            brain.timer.tick()
+            brain.timer.tick(elapsed_frames)
 
     def on_enemy_decision(self, enemy_decision_event: EnemyDecisionEvent):
         """ One of several more behaviors for enemies """
@@ -58,15 +62,22 @@ class AISystem(zesper.Processor):
 
     # TODO: Move this to the enemy class
     def create_projectile(self, position: Position, direction: Direction):
-        projectile_ent = self.world.create_entity()
+        projectile_pool = self.world.get_entity_pool('projectile', self._new_projectile, self._reset_projectile)
+        projectile_pool.spawn(position, direction)
+
+    def _new_projectile(self, position: Position, direction: Direction) -> tuple:
         velocity = Velocity(direction.value.x * 1, direction.value.y * 1)
         position_projectile = Position(position.x, position.y)
-
-        self.world.add_component(projectile_ent, Weapon(1, -1, 7, 3))
-        self.world.add_component(projectile_ent, HitBox(int(position.x), int(position.y), 5, 5, destroy_on_contact=True))
-        self.world.add_component(projectile_ent, position_projectile)
-        self.world.add_component(projectile_ent, velocity)
-        self.world.add_component(projectile_ent, Enemy('projectile'))
+        hitbox = HitBox(int(position.x), int(position.y), 5, 5, destroy_on_contact=True, continuous=True,
+                        category=CollisionLayer.ENEMY_WEAPON, mask=self.PROJECTILE_COLLISION_MASK)
         surface = pygame.Surface((5, 5))
         pygame.draw.rect(surface, config.C_RED, surface.get_rect(), width=1, border_radius=1)
-        self.world.add_component(projectile_ent, Renderable(surface))
+        return Weapon(1, -1, 7, 3), hitbox, position_projectile, velocity, Enemy('projectile'), Renderable(surface)
+
+    @staticmethod
+    def _reset_projectile(components: tuple, position: Position, direction: Direction):
+        weapon, hitbox, position_projectile, velocity, _, _ = components
+        weapon.active_timer.reset()
+        hitbox.topleft = (int(position.x), int(position.y))
+        position_projectile.reset(position.x, position.y)
+        velocity.reset(direction.value.x * 1, direction.value.y * 1)
@@ -10,7 +10,7 @@ class AnimationSystem(zesper.Processor):
 
             if animation.frame_counter >= len(animation.frame_sequence):
                 if animation.one_loop:
-                    self.world.remove_component(ent, Animation)
+                    self.world.disable_component(ent, Animation)
                     continue
                 else:
                     animation.frame_counter = 0
@@ -1,7 +1,24 @@
+from typing import Optional, Callable, Any, Type
+
+import pygame
+
+from yazelc import config as cfg
 from yazelc import zesper
-from yazelc.components import Position, Velocity, HitBox, InteractorTag, Dialog, Weapon, Health, Collectable, Door
-from yazelc.event.events import CollisionEvent, DamageEvent, CollectionEvent, HitDoorEvent, DialogTriggerEvent
+from yazelc.components import Position, Velocity, HitBox, InteractorTag, Dialog, Weapon, Health, Collectable, Door, CollisionBitmap
+from yazelc.event.events import CollisionEvent, DamageEvent, CollectionEvent, HitDoorEvent, DialogTriggerEvent, \
+    CollisionStayEvent, CollisionExitEvent
 from yazelc.player.player import VELOCITY
+from yazelc.utils.spatial_hash import SpatialHash
+
+try:
+    import numpy as np
+    from yazelc.utils.aabb_array import KeyedBounds, overlaps, tile_bounds, to_bounds, to_padded_bounds
+except ImportError:  # NumPy is optional. Without it walls are tested one moving hitbox at a time
+    np = None
+
+# Response to a contact: called with the entity having the first component type, that component, the other entity and
+# its component of the second type (None if the response was registered without a second type)
+CollisionResponse = Callable[[int, Any, int, Any], None]
 
 
 class CollisionSystem(zesper.Processor):
@@ -15,54 +32,306 @@ class CollisionSystem(zesper.Processor):
     The reasoning is that after a "wall" collision entities normally needs a repositioning which can trigger further
     collision with entities which have been already tested negative for collision. This adds a layer of complexity
     as one has to deal with several collision checks
+
+    Impenetrable hitboxes are considered static and are kept in a spatial hash which is built the first time the
+    system runs and is afterwards only updated when an impenetrable hitbox is added or removed from the world. Moving
+    hitboxes are then only tested against the walls on the grid cells around them. The walls of the map tiles can be
+    given instead as a CollisionBitmap component, in which case they are found with direct tile lookups
+
+    If NumPy is available the moving hitboxes can instead be tested in batch. The bounds of the impenetrable hitboxes
+    are then also kept on a persistent array, updated together with the spatial hash, and the colliders of the tile
+    shapes of each collision bitmap on a small table. The region swept by each hitbox on the frame is computed from the
+    coordinate arrays, the walls on it are gathered (directly from the tile cells for the bitmaps) into a padded array
+    and all hitboxes are tested against their walls in one operation. The movement of the colliding ones is reverted
+    along the first free axis, also computed in batch, without allocating test hitboxes
+
+    Hitboxes flagged as continuous, or displaced more than a few pixels in the frame (e.g. on a recoil), are instead
+    swept from their previous position against the walls around their path. They stop at the time of impact and slide
+    along the wall with the rest of the displacement, so they neither tunnel through thin walls nor get trapped
+
+    Moving hitboxes that did not move and were free of walls fall asleep and skip the wall pass until their hitbox is
+    displaced or the walls change. The amount of sleeping bodies skipped on the last frame is kept for profiling
+
+    Penetrable hitboxes are checked with a sort and sweep broadphase. They are kept on a list sorted by their left edge
+    which persists between frames. As entities move only a little each frame the list is almost sorted and re-sorting
+    it is nearly linear. Only the pairs whose horizontal extents overlap and whose collision layers (category and mask)
+    match are tested for an actual collision
+
+    The contacts between penetrable hitboxes are tracked between frames. The collision event is only sent when a contact
+    starts and the exit event when it ends. While the contact lasts a stay event is sent every few frames (if the
+    interval is not zero) such that, e.g., an enemy resting against the player hits again after the invincibility ends
+
+    What happens on a contact is defined by the responses registered for pairs of component types. All the responses
+    matching the pair of entities are called. The matching responses are looked up in a table keyed by the signatures
+    (set of component types) of both entities, which is filled the first time a combination of signatures collides
     """
+    WALL_CELL_SIZE = 2 * cfg.TILE_WIDTH
+    STAY_EVENT_INTERVAL = 10
+    MAX_DISCRETE_DISPLACEMENT = cfg.TILE_WIDTH // 4  # Larger displacements (in pixels per frame) are swept
+
+    def __init__(self, stay_event_interval: int = STAY_EVENT_INTERVAL, batch_walls: bool = cfg.BATCH_WALL_COLLISIONS):
+        super().__init__()
+        self.stay_event_interval = stay_event_interval
+        self.batch_walls = batch_walls and np is not None
+        self._contacts: dict[tuple[int, int], int] = {}  # Frames of contact by entity pair (lowest entity id first)
+        self._wall_index: Optional[SpatialHash] = None
+        self._wall_bounds = KeyedBounds() if self.batch_walls else None  # Same walls as the index, for batched tests
+        self._tile_shape_bounds: list['np.ndarray'] = []  # Colliders of each tile shape of the collision bitmaps
+        self._sweep_list: list[tuple[int, HitBox]] = []  # Penetrable hitboxes sorted along the x-axis
+        self._swept_out: set[tuple[int, int]] = set()  # Removed entries (entity, hitbox id) still on the sweep list
+        self._collision_bitmaps: list[CollisionBitmap] = []
+        self._resting_spots: dict[int, tuple[int, int]] = {}  # Sleeping bodies and the hitbox position they rest at
+        self.sleeping_bodies = 0
+        self._responses: list[tuple[type, Optional[type], CollisionResponse]] = []
+        self._dispatch_table: dict[tuple[frozenset, frozenset], list[tuple[bool, type, Optional[type], CollisionResponse]]] = {}
+
+        self.register_response(InteractorTag, Dialog, self._trigger_dialog)
+        self.register_response(Collectable, None, self._collect)
+        self.register_response(Health, Weapon, self._damage)
+        self.register_response(Door, None, self._hit_door)
 
     def process(self):
+        if self._wall_index is None:
+            self._build_indices()
+        collision_bitmaps = [bitmap for _, bitmap in self.world.get_component(CollisionBitmap)]
+        if collision_bitmaps != self._collision_bitmaps:
+            self._collision_bitmaps = collision_bitmaps
+            self._tile_shape_bounds.clear()
+            self._resting_spots.clear()  # New tile walls may lie on sleeping bodies
 
         # Resolves collision of all moving hitboxes against impenetrable hitboxes
-        impenetrable_hitboxes = [hitbox for ent, hitbox in self.world.get_component(HitBox) if hitbox.impenetrable]
-        for ent, (hitbox, position, velocity) in self.world.get_components(HitBox, Position, Velocity):
-            colliding_hitboxes_indices = hitbox.collidelistall(impenetrable_hitboxes)
-            if colliding_hitboxes_indices:
+        if self.batch_walls:
+            self._resolve_wall_collisions_batched()
+        else:
+            self._resolve_wall_collisions()
+
+        # Everything that it is penetrable it is checked for collision after the movement checks have been resolved
+        self._update_contacts(self._sweep_and_prune())
+
+    def _resolve_wall_collisions(self):
+        for ent, (hitbox, position, velocity) in self._get_awake_movers():
+            if self._is_swept(hitbox, position):
+                self._resolve_swept_collision(ent, position, hitbox)
+                continue
+            nearby_walls = self._get_nearby_walls(ent, hitbox)
+            colliding_hitboxes_indices = hitbox.collidelistall(nearby_walls)
+            if not colliding_hitboxes_indices:
+                self._try_to_sleep(ent, position, hitbox)
+            else:
 
                 if hitbox.skin_depth and len(colliding_hitboxes_indices) == 1:
-                    colliding_wall = impenetrable_hitboxes[colliding_hitboxes_indices[0]]
-                    self._handle_corner_push(position, velocity, hitbox, colliding_wall, impenetrable_hitboxes)
+                    colliding_wall = nearby_walls[colliding_hitboxes_indices[0]]
+                    self._handle_corner_push(ent, position, velocity, hitbox, colliding_wall)
                 elif hitbox.destroy_on_contact:
-                    self.world.delete_entity(ent)
+                    self.world.commands.delete_entity(ent)
                 else:
-                    self._resolve_collision(position, velocity, hitbox, impenetrable_hitboxes)
+                    self._resolve_collision(ent, position, velocity, hitbox)
 
-        # Everything that it is penetrable it is checked for collision after the movement checks have been resolved
-        transparent_hitboxes = [(ent, hb) for ent, hb in self.world.get_component(HitBox) if not hb.impenetrable]
-        for index, (ent_1, hitbox_1) in enumerate(transparent_hitboxes):
-            rect_dictionary = {ent: hb for ent, hb in transparent_hitboxes[index + 1:]}  # prevents double counting and self checking
-            entities_that_collided = hitbox_1.collidedictall(rect_dictionary, 1)
-            for ent_2, _ in entities_that_collided:
-                self.world.event_queue.add(CollisionEvent(ent_1, ent_2))
+    def _resolve_wall_collisions_batched(self):
+        movers = []
+        for mover in self._get_awake_movers():
+            ent, (hitbox, position, _) = mover
+            if self._is_swept(hitbox, position):
+                self._resolve_swept_collision(ent, position, hitbox)
+            else:
+                movers.append(mover)
+        if not movers:
+            return
+
+        bounds = to_bounds(hitbox for _, (hitbox, _, _) in movers)
+        deltas = np.array([(round(position.x) - round(position.prev_x), round(position.y) - round(position.prev_y))
+                           for _, (_, position, _) in movers]).reshape(-1, 2)
+        wall_bounds = self._get_nearby_wall_bounds(np.array([ent for ent, _ in movers]), bounds, deltas)
+        is_overlapping = overlaps(bounds[:, np.newaxis, :], wall_bounds)  # (movers, walls)
+        n_overlaps = is_overlapping.sum(axis=1)
+        to_resolve = []
+        for mover_idx, (ent, (hitbox, position, velocity)) in enumerate(movers):
+            if not n_overlaps[mover_idx]:
+                self._try_to_sleep(ent, position, hitbox)
+            elif hitbox.skin_depth and n_overlaps[mover_idx] == 1:
+                left, top, right, bottom = wall_bounds[mover_idx, is_overlapping[mover_idx].argmax()].tolist()
+                self._handle_corner_push(ent, position, velocity, hitbox, pygame.Rect(left, top, right - left, bottom - top))
+            elif hitbox.destroy_on_contact:
+                self.world.commands.delete_entity(ent)
+            else:
+                to_resolve.append(mover_idx)
+        if to_resolve:
+            self._revert_movements_batched([movers[mover_idx] for mover_idx in to_resolve], bounds[to_resolve],
+                                           deltas[to_resolve], wall_bounds[to_resolve])
 
     def on_collision(self, collision_event: CollisionEvent):
+        self._respond_to_contact(collision_event.ent_1, collision_event.ent_2)
+
+    def on_collision_stay(self, collision_stay_event: CollisionStayEvent):
+        self._respond_to_contact(collision_stay_event.ent_1, collision_stay_event.ent_2)
+
+    def register_response(self, component_type_1: Type, component_type_2: Optional[Type], response: CollisionResponse):
+        """
+        Registers the response called when an entity with the first component type touches another entity with the
+        second one. If the second type is None the response is called for any entity touching the first one
+        """
+        self._responses.append((component_type_1, component_type_2, response))
+        self._dispatch_table.clear()
+
+    def _respond_to_contact(self, ent_1: int, ent_2: int):
+        signatures = (self.world.get_signature(ent_1), self.world.get_signature(ent_2))
+        try:
+            matching_responses = self._dispatch_table[signatures]
+        except KeyError:
+            matching_responses = self._dispatch_table.setdefault(signatures, self._get_matching_responses(*signatures))
+
+        for swapped, component_type_1, component_type_2, response in matching_responses:
+            ent_a, ent_b = (ent_2, ent_1) if swapped else (ent_1, ent_2)
+            component_a = self.world.component_for_entity(ent_a, component_type_1)
+            component_b = self.world.component_for_entity(ent_b, component_type_2) if component_type_2 else None
+            response(ent_a, component_a, ent_b, component_b)
+
+    def _get_matching_responses(self, signature_1: frozenset, signature_2: frozenset) \
+            -> list[tuple[bool, type, Optional[type], CollisionResponse]]:
+        """ Responses matching the pair of signatures in any order. The flag tells if the entities have to be swapped """
+        matching_responses = []
+        for component_type_1, component_type_2, response in self._responses:
+            for swapped, (signature_a, signature_b) in enumerate(((signature_1, signature_2), (signature_2, signature_1))):
+                if component_type_1 in signature_a and (component_type_2 is None or component_type_2 in signature_b):
+                    matching_responses.append((bool(swapped), component_type_1, component_type_2, response))
+        return matching_responses
+
+    def _trigger_dialog(self, _interactor_ent: int, _interactor: InteractorTag, dialog_ent: int, _dialog: Dialog):
+        self.world.event_queue.add(DialogTriggerEvent(dialog_ent))
+
+    def _collect(self, collectable_ent: int, collectable: Collectable, collector_ent: int, _: None):
+        self.world.event_queue.add(CollectionEvent(collectable_ent, collectable, collector_ent))
+
+    def _damage(self, victim_ent: int, _health: Health, attacker_ent: int, _weapon: Weapon):
+        self.world.event_queue.add(DamageEvent(victim_ent, attacker_ent))
 
-        # Handles collision when interacting with entities with the Dialog component
-        if components := self.world.try_pair_signature(collision_event.ent_1, collision_event.ent_2, InteractorTag, Dialog):
-            _, _, dialog_entity_id, _ = components
-            dialog_trigger_event = DialogTriggerEvent(dialog_entity_id)
-            self.world.event_queue.add(dialog_trigger_event)
-        elif component := self.world.try_signature(collision_event.ent_1, collision_event.ent_2, Collectable):
-            collectable_ent_id, collectable, colector_ent_id = component
-            collection_event = CollectionEvent(collectable_ent_id, collectable, colector_ent_id)
-            self.world.event_queue.add(collection_event)
-        elif components := self.world.try_pair_signature(collision_event.ent_1, collision_event.ent_2, Health, Weapon):
-            victim_id, _, attacker_id, _ = components
-            damage_event = DamageEvent(victim_id, attacker_id)
-            self.world.event_queue.add(damage_event)
-        elif component := self.world.try_signature(collision_event.ent_1, collision_event.ent_2, Door):
-            door_entity_id, _, transversing_entity_id = component
-            hit_door_event = HitDoorEvent(door_entity_id, transversing_entity_id)
-            self.world.event_queue.add(hit_door_event)
-
-    def _handle_corner_push(self, position: Position, velocity: Velocity, hitbox: HitBox, colliding_wall: HitBox,
-                            impenetrable_hitboxes: list[HitBox]):
+    def _hit_door(self, door_ent: int, _door: Door, transversing_ent: int, _: None):
+        self.world.event_queue.add(HitDoorEvent(door_ent, transversing_ent))
+
+    def _get_awake_movers(self) -> list[tuple[int, tuple[HitBox, Position, Velocity]]]:
+        """ Moving hitboxes except the sleeping ones, i.e., the ones still resting where they fell asleep """
+        awake_movers = []
+        resting_spots = self._resting_spots
+        self.sleeping_bodies = 0
+        for mover in self.world.get_components(HitBox, Position, Velocity):
+            ent, (hitbox, _, _) = mover
+            if ent in resting_spots:
+                if resting_spots[ent] == hitbox.topleft:
+                    self.sleeping_bodies += 1
+                    continue
+                del resting_spots[ent]
+            awake_movers.append(mover)
+        return awake_movers
+
+    def _try_to_sleep(self, ent: int, position: Position, hitbox: HitBox):
+        """ Puts to sleep the hitbox (free of walls) if it did not move on this frame """
+        if round(position.x) == round(position.prev_x) and round(position.y) == round(position.prev_y):
+            self._resting_spots[ent] = hitbox.topleft
+
+    def _build_indices(self):
+        """ Indexes the hitboxes already in the world and keeps track of the ones added or removed later """
+        self._wall_index = SpatialHash(self.WALL_CELL_SIZE)
+        for ent, hitbox in self.world.get_component(HitBox):
+            self._on_hitbox_added(ent, hitbox)
+        self.world.add_component_listener(HitBox, self._on_hitbox_added, self._on_hitbox_removed)
+
+    def _on_hitbox_added(self, ent: int, hitbox: HitBox):
+        self._resting_spots.pop(ent, None)
+        if hitbox.impenetrable:
+            self._resting_spots.clear()  # The new wall may lie on sleeping bodies
+            self._wall_index.insert(ent, hitbox)
+            if self._wall_bounds is not None:
+                self._wall_bounds.insert(ent, hitbox)
+        elif (ent, id(hitbox)) in self._swept_out:  # Re-added before the sweep list was cleaned up
+            self._swept_out.discard((ent, id(hitbox)))
+        else:
+            self._sweep_list.append((ent, hitbox))
+
+    def _on_hitbox_removed(self, ent: int, hitbox: HitBox):
+        self._resting_spots.pop(ent, None)
+        if any(ent in pair for pair in self._contacts):  # The id may be reused by an entity not touching anything yet
+            self._contacts = {pair: frames for pair, frames in self._contacts.items() if ent not in pair}
+        if hitbox.impenetrable:
+            self._wall_index.remove(ent)
+            if self._wall_bounds is not None:
+                self._wall_bounds.remove(ent)
+        else:
+            self._swept_out.add((ent, id(hitbox)))  # Removed lazily in one pass on the next sweep
+
+    def _update_contacts(self, colliding_pairs: list[tuple[int, int]]):
+        """ Sends the events of the contacts that started, lasted (throttled) or ended since the last frame """
+        previous_contacts = self._contacts
+        self._contacts = {}
+        for pair in colliding_pairs:
+            frames = previous_contacts.pop(pair, -1) + 1
+            self._contacts[pair] = frames
+            if frames == 0:
+                self.world.event_queue.add(CollisionEvent(*pair))
+            elif self.stay_event_interval and frames % self.stay_event_interval == 0:
+                self.world.event_queue.add(CollisionStayEvent(*pair, frames))
+        for pair in previous_contacts:
+            self.world.event_queue.add(CollisionExitEvent(*pair))
+
+    def _sweep_and_prune(self) -> list[tuple[int, int]]:
+        """ Returns the pairs of entities (lowest id first) whose penetrable hitboxes overlap """
+        if self._swept_out:
+            self._sweep_list = [item for item in self._sweep_list if (item[0], id(item[1])) not in self._swept_out]
+            self._swept_out.clear()
+        sweep_list = self._sweep_list
+        sweep_list.sort(key=_left_edge)  # Timsort runs in almost linear time on the nearly sorted list
+
+        colliding_pairs = []
+        n_hitboxes = len(sweep_list)
+        for index, (ent_1, hitbox_1) in enumerate(sweep_list):
+            right_edge = hitbox_1.right
+            for next_index in range(index + 1, n_hitboxes):
+                ent_2, hitbox_2 = sweep_list[next_index]
+                if hitbox_2.left >= right_edge:  # The rest of the list lies further right
+                    break
+                if not (hitbox_1.category & hitbox_2.mask and hitbox_2.category & hitbox_1.mask):
+                    continue
+                if hitbox_1.colliderect(hitbox_2):
+                    colliding_pairs.append((ent_1, ent_2) if ent_1 < ent_2 else (ent_2, ent_1))
+        return colliding_pairs
+
+    def _get_nearby_walls(self, ent: int, rect: pygame.Rect) -> list[pygame.Rect]:
+        """ Impenetrable hitboxes on the grid cells touched by the rect (excluding the entity itself) and tile walls """
+        candidates = self._wall_index.query(rect)
+        candidates.pop(ent, None)
+        nearby_walls = list(candidates.values())
+        for bitmap in self._collision_bitmaps:
+            nearby_walls.extend(bitmap.colliding_rects(rect))
+        return nearby_walls
+
+    def _get_nearby_wall_bounds(self, ents: 'np.ndarray', bounds: 'np.ndarray', deltas: 'np.ndarray') -> 'np.ndarray':
+        """
+        Padded array (movers x walls x 4) of the walls touching the region swept by each mover on the frame, i.e., its
+        hitbox and the positions it can be reverted to. The hitbox of the mover itself is left out
+        """
+        previous_bounds = bounds - np.tile(deltas, 2)
+        swept_bounds = np.concatenate((np.minimum(bounds, previous_bounds)[:, :2], np.maximum(bounds, previous_bounds)[:, 2:]),
+                                      axis=1)
+        walls = self._wall_bounds.bounds
+        is_nearby = overlaps(swept_bounds[:, np.newaxis, :], walls) & (ents[:, np.newaxis] != self._wall_bounds.keys)
+        is_any_nearby = is_nearby.any(axis=0)
+        nearby_walls = [np.where(is_nearby[:, is_any_nearby, np.newaxis], walls[is_any_nearby], 0)]
+
+        for bitmap, shape_bounds in zip(self._collision_bitmaps, self._get_tile_shape_bounds()):
+            cells = np.frombuffer(bitmap.cells, dtype=np.uint8).reshape(bitmap.height, bitmap.width)
+            nearby_walls.append(tile_bounds(cells, shape_bounds, (bitmap.tile_width, bitmap.tile_height), swept_bounds))
+        return np.concatenate(nearby_walls, axis=1)
+
+    def _get_tile_shape_bounds(self) -> list['np.ndarray']:
+        """ Padded colliders of the tile shapes of each bitmap (the first shape being empty), rebuilt on new shapes """
+        shape_bounds = self._tile_shape_bounds
+        for bitmap_idx, bitmap in enumerate(self._collision_bitmaps):
+            if bitmap_idx == len(shape_bounds):
+                shape_bounds.append(to_padded_bounds([()] + bitmap.shapes))
+            elif len(shape_bounds[bitmap_idx]) != len(bitmap.shapes) + 1:
+                shape_bounds[bitmap_idx] = to_padded_bounds([()] + bitmap.shapes)
+        return shape_bounds
+
+    def _handle_corner_push(self, ent: int, position: Position, velocity: Velocity, hitbox: HitBox, colliding_wall: pygame.Rect):
         """
         Handle case colliding with a corner
         1. Confirm that only one wall is collided with the hitbox
@@ -73,7 +342,7 @@ class CollisionSystem(zesper.Processor):
         """
         colliding_corners = colliding_wall.collidelistall(hitbox.corner_rects)
         collides_with_points = hitbox.collides_with_corner_points(colliding_wall)
-        self._resolve_collision(position, velocity, hitbox, impenetrable_hitboxes)
+        self._resolve_collision(ent, position, velocity, hitbox)
         if colliding_corners and len(colliding_corners) == 1 and not collides_with_points:
             corner_idx = colliding_corners[0]
             if corner_idx == 0:
@@ -100,20 +369,83 @@ class CollisionSystem(zesper.Processor):
 
     @staticmethod
     def _update_entity_position(position: Position, velocity: Velocity, hitbox: HitBox):
-        """ exact copy of the method in the movement system """
-        position.move_ip(velocity.x, velocity.y)
-        hitbox.move_ip(round(position.x) - round(position.prev_x), round(position.y) - round(position.prev_y))
+        """ Moves the entity further within the current step, i.e., keeping its previous position """
+        x_pos, y_pos = round(position.x), round(position.y)
+        position.correct(position.x + velocity.x, position.y + velocity.y)
+        hitbox.move_ip(round(position.x) - x_pos, round(position.y) - y_pos)
+
+    def _is_swept(self, hitbox: HitBox, position: Position) -> bool:
+        if hitbox.continuous:
+            return True
+        displacement = abs(round(position.x) - round(position.prev_x)) + abs(round(position.y) - round(position.prev_y))
+        return displacement > self.MAX_DISCRETE_DISPLACEMENT
+
+    def _resolve_swept_collision(self, ent: int, position: Position, hitbox: HitBox):
+        """
+        Moves the hitbox again from its previous position along its displacement until it touches a wall. The rest of the
+        displacement along the wall is swept once more, such that the hitbox slides along it
+        """
+        delta_x = round(position.x) - round(position.prev_x)
+        delta_y = round(position.y) - round(position.prev_y)
+        hitbox.move_ip(-delta_x, -delta_y)
+        swept_rect = pygame.Rect(hitbox.x + min(delta_x, 0), hitbox.y + min(delta_y, 0),
+                                 hitbox.width + abs(delta_x), hitbox.height + abs(delta_y))
+        walls = self._get_nearby_walls(ent, swept_rect)  # Single query for the whole path
+
+        moved_x = moved_y = 0
+        has_hit = False
+        for _ in range(2):
+            fraction, axis = hitbox.time_of_impact(delta_x, delta_y, walls)
+            # On the axis of the hit the product is an integer (up to rounding errors) but elsewhere it has to be floored
+            step_x = round(delta_x * fraction) if axis == 0 else int(delta_x * fraction)
+            step_y = round(delta_y * fraction) if axis == 1 else int(delta_y * fraction)
+            hitbox.move_ip(step_x, step_y)
+            moved_x, moved_y = moved_x + step_x, moved_y + step_y
+            if axis == -1:
+                break
+            has_hit = True
+            delta_x, delta_y = (0, delta_y - step_y) if axis == 0 else (delta_x - step_x, 0)
+
+        if has_hit:
+            if hitbox.destroy_on_contact:
+                self.world.commands.delete_entity(ent)
+            else:
+                position.correct(round(position.prev_x) + moved_x, round(position.prev_y) + moved_y)
 
     @staticmethod
-    def _resolve_collision(position: Position, velocity: Velocity, hitbox: HitBox, impenetrable_hitboxes: list[HitBox]):
+    def _revert_movements_batched(movers: list[tuple[int, tuple[HitBox, Position, Velocity]]], bounds: 'np.ndarray',
+                                  deltas: 'np.ndarray', wall_bounds: 'np.ndarray'):
+        """
+        Reverts the movement along x, y or both (the first one that frees the hitbox from its nearby walls) of every
+        mover. Candidate positions of all movers are tested at once against the bounds of their walls
+        """
+        directions = np.array(((1, 0), (0, 1), (1, 1)))
+        shifts = directions * deltas[:, np.newaxis, :]  # (movers, directions, axes)
+        candidate_bounds = bounds[:, np.newaxis, :] - np.tile(shifts, 2)
+        is_overlapping = overlaps(candidate_bounds[:, :, np.newaxis, :], wall_bounds[:, np.newaxis, :, :])
+        is_free = ~is_overlapping.any(axis=2)  # (movers, directions)
+
+        for mover_idx, (_, (hitbox, position, velocity)) in enumerate(movers):
+            if not is_free[mover_idx].any():
+                raise RuntimeError('Trapped between two impenetrable hitboxes!')
+            direction_idx = is_free[mover_idx].argmax()
+            dir_x, dir_y = directions[direction_idx]
+            hitbox.move_ip(-int(shifts[mover_idx, direction_idx, 0]), -int(shifts[mover_idx, direction_idx, 1]))
+            position.correct(round(position.x - velocity.x * dir_x), round(position.y - velocity.y * dir_y))
+
+    def _resolve_collision(self, ent: int, position: Position, velocity: Velocity, hitbox: HitBox):
         """ Reverts the movement if moving object collides with hitbox """
         for dir_x, dir_y in ((1, 0), (0, 1), (1, 1)):
             delta_x = (round(position.x) - round(position.prev_x)) * dir_x
             delta_y = (round(position.y) - round(position.prev_y)) * dir_y
             test_hitbox = hitbox.move(-delta_x, -delta_y)
-            if test_hitbox.collidelist(impenetrable_hitboxes) == -1:
+            if test_hitbox.collidelist(self._get_nearby_walls(ent, test_hitbox)) == -1:
                 hitbox.move_ip(-delta_x, -delta_y)
-                position.update(round(position.x - velocity.x * dir_x), round(position.y - velocity.y * dir_y))
+                position.correct(round(position.x - velocity.x * dir_x), round(position.y - velocity.y * dir_y))
                 break
         else:  # If we cannot resolve then should we signal death (trapped between two walls)?
             raise RuntimeError('Trapped between two impenetrable hitboxes!')
+
+
+def _left_edge(item: tuple[int, HitBox]) -> int:
+    return item[1].left
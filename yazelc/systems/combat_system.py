@@ -19,6 +19,7 @@ class CombatSystem(zesper.Processor):
     REST_FRAMES_AFTER_TWEEN = 3
     DAMAGE_SOUND_ID = 'hit_2'
     ENEMY_DEATH_SOUND = 'explosion'
+    DEATH_REMOVED_COMPONENTS = (cmp.Brain, cmp.Health, cmp.Enemy, cmp.Weapon)
 
     def __init__(self, player_entity_id: int):
         super().__init__()
@@ -29,7 +30,7 @@ class CombatSystem(zesper.Processor):
         for ent, (weapon_component) in self.world.get_component(cmp.Weapon):
             weapon_component.active_timer.tick()
             if weapon_component.active_timer.has_finished():
-                self.world.delete_entity(ent)
+                self.world.commands.delete_entity(ent)
 
         # Handle temporal invincibility and death.
         for ent, (health) in self.world.get_component(cmp.Health):
@@ -39,9 +40,10 @@ class CombatSystem(zesper.Processor):
                 if ent == self.player_entity_id:
                     self.world.event_queue.add(DeathEvent())
                 else:
-                    for component in (cmp.Brain, cmp.Health, cmp.Enemy, cmp.Weapon):
-                        if self.world.has_component(ent, component):
-                            self.world.remove_component(ent, component)
+                    entity_mask = self.world.get_mask(ent)
+                    for component in self.DEATH_REMOVED_COMPONENTS:
+                        if entity_mask & self.world.component_mask(component):
+                            self.world.commands.remove_component(ent, component)
 
                     self.world.event_queue.add(DeleteEntityEvent(ent), frames_delay=self.TIME_TO_REMOVE_ENT_AFTER_DEATH)
                     position = self.world.component_for_entity(ent, cmp.Position)
@@ -58,8 +60,9 @@ class CombatSystem(zesper.Processor):
         attacker_weapon = self.world.component_for_entity(damage_event.attacker_id, cmp.Weapon)
 
         is_invincible = not victim_health.cooldown_timer.has_finished()
-        is_enemy_enemy_damage = self.world.has_component(damage_event.victim_id, cmp.Enemy) and \
-                                self.world.has_component(damage_event.attacker_id, cmp.Enemy)
+        victim_mask = self.world.get_mask(damage_event.victim_id)
+        is_enemy_enemy_damage = victim_mask & self.world.get_mask(damage_event.attacker_id) & \
+                                self.world.component_mask(cmp.Enemy)
         if is_invincible or is_enemy_enemy_damage:
             return
 
@@ -70,7 +73,7 @@ class CombatSystem(zesper.Processor):
         # Effects on the animation/renderable
         if state := self.world.try_component(damage_event.victim_id, cmp.State):
             state.status = Status.HIT  # todo: is this necessary at all? why do we need this?
-        if self.world.has_component(damage_event.victim_id, cmp.Renderable):
+        if victim_mask & self.world.component_mask(cmp.Renderable):
             self.world.add_component(damage_event.victim_id, cmp.BlendEffect(attacker_weapon.freeze_frames))
         self.world.event_queue.add(SoundTriggerEvent(self.DAMAGE_SOUND_ID))
 
@@ -90,12 +93,12 @@ class CombatSystem(zesper.Processor):
             self.world.event_queue.add(hud_event)
             block_event = BlockInputEvent(attacker_weapon.freeze_frames)
             self.world.event_queue.add(block_event)
-            self.world.remove_component(damage_event.victim_id, cmp.Animation)
+            self.world.disable_component(damage_event.victim_id, cmp.Animation)
 
         if brain := self.world.try_component(damage_event.victim_id, cmp.Brain):
             brain.block_timer.set(attacker_weapon.freeze_frames)
             if self.world.has_component(damage_event.victim_id, cmp.Animation):
-                self.world.remove_component(damage_event.victim_id, cmp.Animation)
+                self.world.disable_component(damage_event.victim_id, cmp.Animation)
 
         logging.info(
             f'Entity {damage_event.victim_id} has received {attacker_weapon.damage} and has {victim_health.points} health points remaining')
@@ -54,8 +54,8 @@ class DialogMenuSystem(zesper.Processor):
         for entity, (dialog_, renderable_) in self.world.get_components(Dialog, Renderable):
             if input_event.controller.is_button_pressed(Button.A) and dialog_.idle:
                 if dialog_.is_at_end():
-                    self.world.remove_component(entity, Renderable)
-                    self.world.remove_component(entity, Position)
+                    self.world.disable_component(entity, Renderable)
+                    self.world.disable_component(entity, Position)
                     dialog_.index = 0
                     dialog_.index_start = 0
                     self.world.event_queue.add(ResumeEvent())
@@ -9,9 +9,6 @@ class HudSystem(zesper.Processor):
         super().__init__()
         self.hud_entity_id = hud_entity_id
 
-    def process(self):
-        pass
-
     def on_hud_update(self, hud_update_event: HudUpdateEvent):
         if hud_update_event.pickable_item_type == CollectableItemType.HEART:
             hud.update_hud_hearts(self.hud_entity_id, hud_update_event.value, self.world)
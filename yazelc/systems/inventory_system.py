@@ -16,7 +16,6 @@ class InventorySystem(zesper.Processor):
     TREASURE_OBJECT_ACCELERATION = 0.3
     TREASURE_OBJECT_LIFETIME = 25
     TREASURE_OBJECT_OFFSET = 5
-
     def __init__(self, player_entity_id: int, inventory: dict[items.CollectableItemType, int]):
         super().__init__()
         self.player_entity_id = player_entity_id
@@ -24,9 +23,6 @@ class InventorySystem(zesper.Processor):
         # Here we may include weapons, etc., perhaps some other stuff like how many levels one has passed, etc, i.e., the current
         # state of the player. Or perhaps we should include this in another instance??
 
-    def process(self):
-        pass
-
     def on_collection(self, collection_event: CollectionEvent):
 
         # Check if the other entity is the players, i.e., no other enemy or moving entity with hitbox can pick up any pickable
@@ -1,60 +1,325 @@
+from bisect import insort
+from collections import OrderedDict
+from collections.abc import Iterator
+from typing import Optional
+
 import pygame
+import pygame.freetype
 
 from yazelc import components as cmp
 from yazelc import config as cfg
 from yazelc import zesper
 from yazelc.camera import Camera
+from yazelc.utils.spatial_hash import SpatialHash
 
 
 class RenderSystem(zesper.Processor):
-    def __init__(self, window: pygame.Surface, camera: Camera = None):
+    """
+    Draws the world as seen by the camera. On a fixed timestep, moving entities and the camera are drawn interpolated
+    between their positions of the last two simulation steps
+
+    Sprites are kept in persistent buckets, one per depth, which are walked in order of depth on every frame. The buckets
+    are updated by listeners when renderables or positions are added or removed, and when a sprite is found in the bucket
+    of a depth it no longer has (it is moved after the frame is drawn)
+
+    Each bucket indexes the bounds of its (non-absolute) sprites on a spatial hash, so only the ones on the cells seen by
+    the camera are looked at. The bounds of the moving sprites (the ones with velocity) are updated before each frame and
+    the ones of the drawn sprites while drawing them. Particles off the view are skipped as well
+
+    In dirty rectangle mode only the screen regions that changed since the last frame are drawn again and presented. It
+    falls back to drawing the whole frame when the camera scrolls (and on debug mode)
+    """
+    simulated = False
+    OVERLAY_FONT_SIZE = 8
+    OVERLAY_REFRESH_FRAMES = 30  # Statistics of the profiler overlay are only recomputed every these many frames
+    INDEX_CELL_SIZE = 4 * cfg.TILE_WIDTH
+    CULLING_MARGIN = cfg.TILE_WIDTH  # Covers the interpolation and the frames of an animation larger than the indexed
+    TINT_CACHE_SIZE = 64  # Tinted images of the blend effects, the least recently used ones are evicted
+
+    def __init__(self, window: pygame.Surface, camera: Camera = None, dirty_rects: bool = cfg.DIRTY_RECT_RENDERING):
         super().__init__()
         self.camera = camera if camera else Camera(0, 0)
         self.window = window
+        self.dirty_rects = dirty_rects
+        self._overlay_font: Optional[pygame.freetype.Font] = None
+        self._overlay_lines: list[str] = []
+        self._overlay_frame = 0
+        self._depth_buckets: Optional[dict[int, dict[int, tuple[cmp.Renderable, cmp.Position]]]] = None
+        self._depth_indices: dict[int, SpatialHash] = {}  # World bounds of the non-absolute sprites of each bucket
+        self._depth_absolutes: dict[int, set[int]] = {}  # Absolute sprites of each bucket, never culled
+        self._tint_cache: OrderedDict[tuple[pygame.Surface, tuple[int, ...]], pygame.Surface] = OrderedDict()
+        self._depths: list[int] = []  # Sorted depths of the buckets
+        self._entity_depths: dict[int, int] = {}  # Depth of the bucket of each entity
+        # Frame statistics
+        self.drawn_sprites = 0
+        self.culled_sprites = 0
+        self.drawn_particles = 0
+        self.culled_particles = 0
+        # What was drawn on the last frame (dirty rectangle mode)
+        self._drawn_sprites: Optional[dict[int, tuple[pygame.Surface, pygame.Rect]]] = None
+        self._drawn_particle_rects: list[pygame.Rect] = []
+        self._vacated_rects: list[pygame.Rect] = []  # Rectangles of the drawn sprites removed since the last frame
+        self._drawn_camera_pos: Optional[tuple[int, int]] = None
 
     def process(self):
-        self.window.fill(cfg.C_BLACK)
+        if self._depth_buckets is None:
+            self._build_depth_buckets()
+        interpolation = self.world.interpolation
+        camera_pos = self.camera.interpolated_pos(interpolation)
+        sprites = self._get_sprites(camera_pos, interpolation)
+
+        # Render native shapes which are (normally) associated with particle effects
+        particles = []
+        screen_rect = self.window.get_rect()
+        all_particles = self.world.get_components(cmp.Particle, cmp.Position)
+        for ent, (vfx, pos) in all_particles:
+            if interpolation < 1:
+                pos = _interpolate(pos, interpolation)
+            rect = pygame.Rect(round(pos.x - camera_pos.x), round(pos.y - camera_pos.y), 1, 1)
+            if screen_rect.colliderect(rect):
+                particles.append((vfx.color, rect))
+        self.drawn_particles = len(particles)
+        self.culled_particles = len(all_particles) - len(particles)
 
-        # Render sprites
-        camera_pos = self.camera.pos
-        for ent, (rend, pos) in sorted(self.world.get_components(cmp.Renderable, cmp.Position), key=lambda x: x[1][0].depth, reverse=False):
+        rounded_camera_pos = (round(camera_pos.x), round(camera_pos.y))
+        if not self.dirty_rects or cfg.DEBUG_MODE or self._drawn_sprites is None or \
+                rounded_camera_pos != self._drawn_camera_pos:
+            self._draw_all(sprites, particles, camera_pos)
+            pygame.display.flip()
+        else:
+            dirty_rects = self._get_dirty_rects(sprites, particles)
+            self._redraw(dirty_rects, sprites, particles)
+            pygame.display.update(dirty_rects)
 
-            if pos.absolute:
-                screen_pos = pos
-            else:
-                screen_pos = pos - camera_pos
+        if self.dirty_rects:
+            self._drawn_sprites = {ent: (image, rect) for ent, image, rect, _ in sprites}
+            self._drawn_particle_rects = [rect for _, rect in particles]
+            self._drawn_camera_pos = rounded_camera_pos
+            self._vacated_rects.clear()
 
-            if blend := self.world.try_component(ent, cmp.BlendEffect):
-                new_image = rend.image.copy()
-                block = pygame.Surface(rend.image.get_size()).convert_alpha()
-                if blend.timer.module(blend.blink_interval):
-                    color = cfg.C_LIGHT_RED
+    def _get_sprites(self, camera_pos: pygame.Vector2, interpolation: float) \
+            -> list[tuple[int, pygame.Surface, pygame.Rect, bool]]:
+        """ Entity, image, screen rectangle and absolute flag of the sprites on the view to draw in order of depth """
+        self._update_moving_bounds()
+        view_rect = self.window.get_rect(topleft=(round(camera_pos.x), round(camera_pos.y)))
+        culling_rect = view_rect.inflate(2 * self.CULLING_MARGIN, 2 * self.CULLING_MARGIN)
+        render_mask = self.world.component_mask(cmp.Renderable, cmp.Position)
+        skip_disabled = self.world.any_disabled(render_mask)
+        sprites = []
+        moved_sprites = []
+        self.culled_sprites = 0
+        for depth in self._depths:
+            for ent, rend, pos in self._get_sprites_on_view(depth, culling_rect):
+                if rend.depth != depth:
+                    moved_sprites.append((ent, rend, pos))
+                if skip_disabled and self.world.get_disabled_mask(ent) & render_mask:
+                    continue
+                if pos.absolute:
+                    screen_pos = pos
+                elif interpolation < 1 and self.world.has_component(ent, cmp.Velocity):
+                    screen_pos = _interpolate(pos, interpolation) - camera_pos
                 else:
-                    color = cfg.C_LIGHT_BLUE
-                block.fill(color)
-                new_image.blit(block, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
-                new_image.blit(new_image, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+                    screen_pos = pos - camera_pos
+                image = self._get_image(ent, rend)
+                sprites.append((ent, image, image.get_rect(topleft=(round(screen_pos.x), round(screen_pos.y))),
+                                pos.absolute))
+        for ent, rend, pos in moved_sprites:
+            self._insert_sprite(ent, rend, pos)
+        self._tick_blend_effects()
+        self.drawn_sprites = len(sprites)
+        return sprites
+
+    def _get_sprites_on_view(self, depth: int, culling_rect: pygame.Rect) \
+            -> Iterator[tuple[int, cmp.Renderable, cmp.Position]]:
+        """
+        Absolute sprites of the bucket and the ones whose bounds overlap the rectangle, in order of insertion. The other
+        ones are counted as culled
+        """
+        index = self._depth_indices[depth]
+        absolutes = self._depth_absolutes[depth]
+        candidates = index.query(culling_rect)
+        for ent, (rend, pos) in self._depth_buckets[depth].items():
+            if ent in absolutes:
+                yield ent, rend, pos
+            elif (bounds := candidates.get(ent)) is not None and culling_rect.colliderect(bounds):
+                index.move(ent, _get_bounds(rend, pos))  # Also for the sprites moved without velocity
+                yield ent, rend, pos
+            else:
+                self.culled_sprites += 1
 
-                blend.timer.tick()
-                if blend.timer.has_finished():
-                    self.world.remove_component(ent, cmp.BlendEffect)
+    def _update_moving_bounds(self):
+        for ent, (_, pos) in self.world.get_components(cmp.Velocity, cmp.Position, include_disabled=True):
+            if (depth := self._entity_depths.get(ent)) is not None and not pos.absolute:
+                self._depth_indices[depth].move(ent, _get_bounds(*self._depth_buckets[depth][ent]))
 
-                img = new_image
+    def _get_image(self, ent: int, rend: cmp.Renderable) -> pygame.Surface:
+        if blend := self.world.try_component(ent, cmp.BlendEffect):
+            if blend.timer.module(blend.blink_interval):
+                color = cfg.C_LIGHT_RED
             else:
-                img = rend.image
+                color = cfg.C_LIGHT_BLUE
+            return self._get_tinted_image(rend.image, color)
+        else:
+            return rend.image
 
-            self.window.blit(img, (round(screen_pos.x), round(screen_pos.y)))
+    def _tick_blend_effects(self):
+        """ Effects run also while their sprites are culled, e.g., an enemy hit while leaving the view """
+        for ent, blend in self.world.get_component(cmp.BlendEffect):
+            blend.timer.tick()
+            if blend.timer.has_finished():
+                self.world.commands.remove_component(ent, cmp.BlendEffect)
+
+    def _get_tinted_image(self, image: pygame.Surface, color: pygame.Color) -> pygame.Surface:
+        key = (image, tuple(color))
+        if (tinted_image := self._tint_cache.get(key)) is not None:
+            self._tint_cache.move_to_end(key)
+            return tinted_image
+        tinted_image = _tint(image, color)
+        self._tint_cache[key] = tinted_image
+        if len(self._tint_cache) > self.TINT_CACHE_SIZE:
+            self._tint_cache.popitem(last=False)
+        return tinted_image
+
+    def _draw_all(self, sprites: list[tuple[int, pygame.Surface, pygame.Rect, bool]],
+                  particles: list[tuple[pygame.Color, pygame.Rect]], camera_pos: pygame.Vector2):
+        self.window.fill(cfg.C_BLACK)
+        for _, image, rect, _ in sprites:
+            self.window.blit(image, rect)
 
         # TODO: They can be on the the same loop if the position has the absolute flag on
-        # Render native shapes which are (normally) associated with particle effects
-        for ent, (vfx, pos) in self.world.get_components(cmp.Particle, cmp.Position):
-            rect = pygame.Rect(round(pos.x - camera_pos.x), round(pos.y - camera_pos.y), 1, 1)
-            pygame.draw.rect(self.window, vfx.color, rect)
+        for color, rect in particles:
+            pygame.draw.rect(self.window, color, rect)
 
         if cfg.DEBUG_MODE:  # On debug mode then render all hitboxes
-            for ent, (hitbox) in self.world.get_component(cmp.HitBox):
+            hitboxes = [hitbox for ent, (hitbox) in self.world.get_component(cmp.HitBox)]
+            view_rect = pygame.Rect(round(camera_pos.x), round(camera_pos.y), cfg.RESOLUTION.x, cfg.RESOLUTION.y)
+            for ent, (bitmap) in self.world.get_component(cmp.CollisionBitmap):
+                hitboxes.extend(bitmap.colliding_rects(view_rect))
+            for hitbox in hitboxes:
                 hb_surface = pygame.Surface((hitbox.w, hitbox.h), flags=pygame.SRCALPHA)
                 hb_surface.fill(cfg.C_TRANSPARENT_BLUE)
                 self.window.blit(hb_surface, (hitbox.x - round(camera_pos.x), hitbox.y - round(camera_pos.y)))
+            if self.world.profiler:
+                self._draw_profiler_overlay()
+
+    def _get_dirty_rects(self, sprites: list[tuple[int, pygame.Surface, pygame.Rect, bool]],
+                         particles: list[tuple[pygame.Color, pygame.Rect]]) -> list[pygame.Rect]:
+        """
+        Screen regions that changed since the last frame: the old and new rectangles of the sprites that moved, changed
+        image, appeared or disappeared, and the ones of all particles. Absolute sprites (the HUD, dialogs and menus)
+        are always redrawn since their images are drawn on in place
+        """
+        dirty_rects = []
+        previous_sprites = dict(self._drawn_sprites)
+        for ent, image, rect, absolute in sprites:
+            previous_image, previous_rect = previous_sprites.pop(ent, (None, None))
+            if absolute or image is not previous_image or rect != previous_rect:
+                dirty_rects.append(rect)
+                if previous_rect is not None and previous_rect != rect:
+                    dirty_rects.append(previous_rect)
+        dirty_rects.extend(rect for _, rect in previous_sprites.values())  # Sprites no longer drawn
+        dirty_rects.extend(self._vacated_rects)
+        dirty_rects.extend(self._drawn_particle_rects)
+        dirty_rects.extend(rect for _, rect in particles)
+        return dirty_rects
+
+    def _redraw(self, dirty_rects: list[pygame.Rect], sprites: list[tuple[int, pygame.Surface, pygame.Rect, bool]],
+                particles: list[tuple[pygame.Color, pygame.Rect]]):
+        """ Draws again everything overlapping each of the regions, clipped to it """
+        sprite_rects = [rect for _, _, rect, _ in sprites]
+        particle_rects = [rect for _, rect in particles]
+        for dirty_rect in dirty_rects:
+            self.window.set_clip(dirty_rect)
+            self.window.fill(cfg.C_BLACK)
+            for index in dirty_rect.collidelistall(sprite_rects):
+                _, image, rect, _ = sprites[index]
+                self.window.blit(image, rect)
+            for index in dirty_rect.collidelistall(particle_rects):
+                color, rect = particles[index]
+                pygame.draw.rect(self.window, color, rect)
+        self.window.set_clip(None)
+
+    def _build_depth_buckets(self):
+        """ Buckets the sprites already in the world and keeps track of the ones added or removed later """
+        self._depth_buckets = {}
+        for ent, (rend, pos) in self.world.get_components(cmp.Renderable, cmp.Position, include_disabled=True):
+            self._insert_sprite(ent, rend, pos)
+        self.world.add_component_listener(cmp.Renderable, self._on_renderable_added, self._on_sprite_removed)
+        self.world.add_component_listener(cmp.Position, self._on_position_added, self._on_sprite_removed)
+
+    def _on_renderable_added(self, ent: int, rend: cmp.Renderable):
+        if (pos := self.world.try_component(ent, cmp.Position)) is not None:
+            self._insert_sprite(ent, rend, pos)
+
+    def _on_position_added(self, ent: int, pos: cmp.Position):
+        if (rend := self.world.try_component(ent, cmp.Renderable)) is not None:
+            self._insert_sprite(ent, rend, pos)
+
+    def _on_sprite_removed(self, ent: int, _component):
+        self._remove_sprite(ent)
+        if self._drawn_sprites and ent in self._drawn_sprites:  # Its id may be reused by a new sprite
+            self._vacated_rects.append(self._drawn_sprites.pop(ent)[1])
+
+    def _insert_sprite(self, ent: int, rend: cmp.Renderable, pos: cmp.Position):
+        self._remove_sprite(ent)
+        if rend.depth not in self._depth_buckets:
+            self._depth_buckets[rend.depth] = {}
+            self._depth_indices[rend.depth] = SpatialHash(self.INDEX_CELL_SIZE)
+            self._depth_absolutes[rend.depth] = set()
+            insort(self._depths, rend.depth)
+        self._depth_buckets[rend.depth][ent] = (rend, pos)
+        if pos.absolute:
+            self._depth_absolutes[rend.depth].add(ent)
+        else:
+            self._depth_indices[rend.depth].insert(ent, _get_bounds(rend, pos))
+        self._entity_depths[ent] = rend.depth
+
+    def _remove_sprite(self, ent: int):
+        depth = self._entity_depths.pop(ent, None)
+        if depth is None:
+            return
+        bucket = self._depth_buckets[depth]
+        del bucket[ent]
+        self._depth_indices[depth].remove(ent)
+        self._depth_absolutes[depth].discard(ent)
+        if not bucket:
+            del self._depth_buckets[depth]
+            del self._depth_indices[depth]
+            del self._depth_absolutes[depth]
+            self._depths.remove(depth)
+
+    def _draw_profiler_overlay(self):
+        """ Mean and 99th percentile of the time spent by each processor during the last frames """
+        if self._overlay_font is None:
+            self._overlay_font = pygame.freetype.Font(None, self.OVERLAY_FONT_SIZE)
+        if self._overlay_frame % self.OVERLAY_REFRESH_FRAMES == 0:
+            self._overlay_lines = [f'{name.removesuffix("System"):<14}{stats.mean * 1000:5.2f}{stats.p99 * 1000:6.2f} ms'
+                                   for name, stats in self.world.profiler.processor_stats().items()]
+        self._overlay_frame += 1
+
+        culling_lines = [f'{"Sprites":<14}{self.drawn_sprites:5} drawn{self.culled_sprites:6} culled',
+                         f'{"Particles":<14}{self.drawn_particles:5} drawn{self.culled_particles:6} culled']
+        line_height = self._overlay_font.get_sized_height()
+        for line_idx, line in enumerate(self._overlay_lines + culling_lines):
+            self._overlay_font.render_to(self.window, (2, 2 + line_idx * line_height), line, fgcolor=cfg.C_WHITE,
+                                         bgcolor=cfg.C_BLACK)
+
+
+def _tint(image: pygame.Surface, color: pygame.Color) -> pygame.Surface:
+    """ Copy of the image with its colors clamped to the input one and brightened """
+    tinted_image = image.copy()
+    block = pygame.Surface(image.get_size()).convert_alpha()
+    block.fill(color)
+    tinted_image.blit(block, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
+    tinted_image.blit(tinted_image, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+    return tinted_image
+
+
+def _get_bounds(rend: cmp.Renderable, pos: cmp.Position) -> pygame.Rect:
+    """ Rectangle covered by the current image of the sprite on the world """
+    return rend.image.get_rect(topleft=(round(pos.x), round(pos.y)))
+
 
-        pygame.display.flip()
+def _interpolate(position: cmp.Position, interpolation: float) -> pygame.Vector2:
+    """ Position between the previous and the current one """
+    return pygame.Vector2(position.prev_x, position.prev_y).lerp(position, interpolation)
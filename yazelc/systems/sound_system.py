@@ -3,10 +3,6 @@ from yazelc.event.events import SoundTriggerEvent, SoundEndEvent
 
 
 class SoundSystem(zesper.Processor):
-
-    def process(self):
-        pass
-
     def on_sound_trigger(self, sound_trigger_event: SoundTriggerEvent):
         sound = self.world.resource_manager.get_sound(sound_trigger_event.id_str)
         sound.play()
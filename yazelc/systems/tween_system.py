@@ -9,7 +9,7 @@ class TweenSystem(zesper.Processor):
         for ent, (tween, velocity) in self.world.get_components(TweenPosition, Velocity):
             if tween.frame_counter == tween.n_frames:
                 if tween.rest_frames == 0:
-                    self.world.remove_component(ent, TweenPosition)
+                    self.world.commands.remove_component(ent, TweenPosition)
                 else:
                     tween.rest_frames -= 1
             else:
@@ -17,7 +17,7 @@ class VisualEffectsSystem(zesper.Processor):
             vel.x = vel.x * self.FRICTION
             vel.y = vel.y * self.FRICTION
             if isclose(vel.x, 0, abs_tol=self.ABS_TOL) and isclose(vel.y, 0, abs_tol=self.ABS_TOL):
-                self.world.delete_entity(ent)
+                self.world.commands.delete_entity(ent)
 
     def on_explosion(self, explosion: ExplosionEvent):
         vfx.create_explosion(explosion.position, explosion.n_particles, explosion.max_vel, explosion.color, self.world)
@@ -0,0 +1,315 @@
+import random
+import unittest
+
+import pygame
+
+pygame.init()
+pygame.freetype.init()
+
+from yazelc import zesper
+from yazelc.components import HitBox, Position, Velocity, CollisionBitmap, CollisionLayer, Health, Weapon
+from yazelc.event.event_queue import EventQueue
+from yazelc.event.events import CollisionEvent, CollisionStayEvent, CollisionExitEvent, DamageEvent
+from yazelc.resource_manager import ResourceManager
+from yazelc.systems.collision_system import CollisionSystem
+from yazelc.systems.movement_system import MovementSystem
+from yazelc.systems.render_system import _interpolate
+from yazelc.utils.spatial_hash import SpatialHash
+
+try:
+    import numpy as np
+    from yazelc.utils.aabb_array import KeyedBounds, overlaps, tile_bounds, to_bounds, to_padded_bounds
+except ImportError:
+    np = None
+
+
+class TestSpatialHash(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.spatial_hash = SpatialHash(cell_size=16)
+        self.spatial_hash.insert(1, pygame.Rect(0, 0, 16, 16))
+        self.spatial_hash.insert(2, pygame.Rect(100, 100, 40, 16))
+
+    def test_query_only_returns_nearby_rects(self):
+        self.assertEqual(list(self.spatial_hash.query(pygame.Rect(4, 4, 8, 8))), [1])
+        self.assertEqual(list(self.spatial_hash.query(pygame.Rect(130, 110, 2, 2))), [2])
+        self.assertFalse(self.spatial_hash.query(pygame.Rect(50, 50, 10, 10)))
+
+    def test_remove(self):
+        self.spatial_hash.remove(2)
+        self.assertNotIn(2, self.spatial_hash)
+        self.assertFalse(self.spatial_hash.query(pygame.Rect(100, 100, 40, 16)))
+        self.assertEqual(len(self.spatial_hash), 1)
+
+
+@unittest.skipUnless(np, 'NumPy is not installed')
+class TestAABBArray(unittest.TestCase):
+
+    def test_overlaps_match_colliderect(self):
+        rng = random.Random(0)
+        random_rect = lambda: pygame.Rect(rng.randrange(50), rng.randrange(50), rng.randrange(10), rng.randrange(10))  # noqa
+        rects = [random_rect() for _ in range(20)]
+        rect_lists = [[random_rect() for _ in range(rng.randrange(6))] for _ in range(20)]
+
+        is_overlapping = overlaps(to_bounds(rects)[:, np.newaxis, :], to_padded_bounds(rect_lists))
+        self.assertEqual(is_overlapping.shape, (20, max(len(rect_list) for rect_list in rect_lists)))
+        for row, (rect, rect_list) in enumerate(zip(rects, rect_lists)):
+            self.assertEqual(list(is_overlapping[row, :len(rect_list)]), [bool(rect.colliderect(other)) for other in rect_list])
+            self.assertFalse(is_overlapping[row, len(rect_list):].any())  # Padding
+
+    def test_tile_bounds_match_bitmap_queries(self):
+        rng = random.Random(0)
+        bitmap = CollisionBitmap(6, 5, 16, 8)
+        for _ in range(12):
+            bitmap.set_collider(rng.randrange(6), rng.randrange(5), pygame.Rect(0, 0, rng.randrange(1, 17), rng.randrange(1, 9)))
+        rects = [pygame.Rect(rng.randrange(-20, 100), rng.randrange(-20, 50), rng.randrange(30), rng.randrange(20))
+                 for _ in range(20)]
+        cells = np.frombuffer(bitmap.cells, dtype=np.uint8).reshape(bitmap.height, bitmap.width)
+        bounds = tile_bounds(cells, to_padded_bounds([()] + bitmap.shapes), (16, 8), to_bounds(rects))
+        is_overlapping = overlaps(to_bounds(rects)[:, np.newaxis, :], bounds)
+        for row, rect in enumerate(rects):
+            expected = sorted(to_bounds(bitmap.colliding_rects(rect)).tolist())
+            self.assertEqual(sorted(bounds[row][is_overlapping[row]].tolist()), expected)
+
+    def test_keyed_bounds_stay_contiguous(self):
+        keyed_bounds = KeyedBounds(capacity=2)
+        for key in range(4):
+            keyed_bounds.insert(key, pygame.Rect(key, 0, 1, 1))
+        keyed_bounds.remove(1)
+        keyed_bounds.remove(7)
+        keyed_bounds.insert(2, pygame.Rect(9, 9, 1, 1))
+        self.assertEqual(len(keyed_bounds), 3)
+        self.assertEqual(dict(zip(keyed_bounds.keys.tolist(), keyed_bounds.bounds.tolist())),
+                         {0: [0, 0, 1, 1], 3: [3, 0, 4, 1], 2: [9, 9, 10, 10]})
+
+
+class TestCollisionBitmap(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.bitmap = CollisionBitmap(4, 4, 16, 16)
+        self.bitmap.set_collider(1, 0, pygame.Rect(0, 0, 16, 16))
+        self.bitmap.set_collider(2, 2, pygame.Rect(0, 8, 16, 8))
+
+    def test_tile_queries(self):
+        self.assertTrue(self.bitmap.is_blocked(1, 0))
+        self.assertFalse(self.bitmap.is_blocked(0, 0))
+        self.assertFalse(self.bitmap.is_blocked(10, 10))
+        self.assertEqual(len(self.bitmap.shapes), 2)
+
+    def test_is_walkable(self):
+        self.assertFalse(self.bitmap.is_walkable(20, 4))
+        self.assertTrue(self.bitmap.is_walkable(36, 36))
+        self.assertFalse(self.bitmap.is_walkable(36, 44))
+        self.assertFalse(self.bitmap.is_walkable(-1, 4))
+
+    def test_stacked_tile_colliders_are_all_kept(self):
+        bitmap = CollisionBitmap(4, 4, 16, 16)
+        for layer_collider in (pygame.Rect(0, 0, 16, 8), pygame.Rect(0, 0, 4, 16), pygame.Rect(0, 0, 16, 8)):
+            bitmap.set_collider(1, 1, layer_collider)
+        bitmap.set_collider(2, 1, pygame.Rect(0, 0, 16, 8))
+        self.assertEqual(bitmap.colliding_rects(pygame.Rect(16, 16, 16, 16)), [pygame.Rect(16, 16, 16, 8),
+                                                                               pygame.Rect(16, 16, 4, 16)])
+        self.assertFalse(bitmap.is_walkable(17, 30))
+        self.assertTrue(bitmap.is_walkable(30, 30))
+        self.assertEqual(len(bitmap.shapes), 2)
+
+    def test_colliding_rects(self):
+        self.assertEqual(self.bitmap.colliding_rects(pygame.Rect(10, 10, 10, 10)), [pygame.Rect(16, 0, 16, 16)])
+        self.assertEqual(self.bitmap.colliding_rects(pygame.Rect(32, 32, 16, 8)), [])
+        self.assertEqual(self.bitmap.colliding_rects(pygame.Rect(30, 30, 10, 20)), [pygame.Rect(32, 40, 16, 8)])
+
+
+class TestCollisionSystem(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.world = zesper.World(ResourceManager(), EventQueue())
+        self.collision_system = CollisionSystem()
+        self.world.add_processor(self.collision_system)
+        self.wall_id = self.world.create_entity(HitBox(20, 0, 16, 16, impenetrable=True))
+
+    def _create_mover(self, x_pos: int, y_pos: int, vel_x: float, vel_y: float, **hitbox_kwargs) -> int:
+        position = Position(x_pos, y_pos)
+        position.move_ip(vel_x, vel_y)
+        hitbox = HitBox(round(position.x), round(position.y), 10, 10, **hitbox_kwargs)
+        return self.world.create_entity(hitbox, position, Velocity(vel_x, vel_y))
+
+    def _pop_events(self) -> list:
+        events = []
+        while self.world.event_queue:
+            events.append(self.world.event_queue.popleft())
+        return events
+
+    def test_movement_into_wall_is_reverted(self):
+        mover_id = self._create_mover(8, 2, 4, 0)
+        self.world.process()
+        self.assertEqual(self.world.component_for_entity(mover_id, HitBox).x, 8)
+
+    def test_blocked_mover_is_interpolated_outside_the_wall(self):
+        self.world.add_processor(MovementSystem(), priority=1)
+        position = Position(10, 2)
+        self.world.create_entity(HitBox(10, 2, 10, 10), position, Velocity(2, 0))
+        for _ in range(3):
+            self.world.process()
+            self.assertEqual((position.x, position.prev_x), (10, 10))
+            self.assertEqual(_interpolate(position, 0.5).x, 10)
+
+    def test_fast_movers_do_not_tunnel_through_walls(self):
+        mover_id = self._create_mover(0, 2, 40, 0)
+        sliding_mover_id = self._create_mover(0, 2, 15, 10)
+        projectile_id = self._create_mover(60, 2, -3, 0, continuous=True, destroy_on_contact=True)
+        self.world.process()
+        self.assertEqual(self.world.component_for_entity(mover_id, HitBox).topleft, (10, 2))
+        self.assertEqual(self.world.component_for_entity(mover_id, Position), Position(10, 2))
+        self.assertEqual(self.world.component_for_entity(sliding_mover_id, HitBox).topleft, (10, 12))
+        self.assertTrue(self.world.entity_exists(projectile_id))
+
+        position = self.world.component_for_entity(projectile_id, Position)
+        position.move_ip(-50, 0)
+        self.world.component_for_entity(projectile_id, HitBox).move_ip(-50, 0)
+        self.world.process()
+        self.world.process()  # Entities are deleted at the start of the next frame
+        self.assertFalse(self.world.entity_exists(projectile_id))
+
+    def test_resting_bodies_sleep_until_they_move(self):
+        for batch_walls in (False, True) if np else (False,):
+            self.world.remove_processor(CollisionSystem)
+            self.collision_system = CollisionSystem(batch_walls=batch_walls)
+            self.world.add_processor(self.collision_system)
+            mover_id = self._create_mover(0, 2, 0, 0)
+            self.world.process()
+            self.world.process()
+            self.assertEqual(self.collision_system.sleeping_bodies, 1)
+
+            position = self.world.component_for_entity(mover_id, Position)
+            position.move_ip(12, 0)
+            self.world.component_for_entity(mover_id, HitBox).move_ip(12, 0)
+            self.world.process()
+            self.assertEqual(self.collision_system.sleeping_bodies, 0)
+            self.assertEqual(self.world.component_for_entity(mover_id, HitBox).x, 10)
+            self.world.delete_entity(mover_id, immediate=True)
+
+    def test_walls_added_and_removed_after_first_frame(self):
+        self.world.process()
+        self.world.create_entity(HitBox(60, 0, 16, 16, impenetrable=True))
+        mover_id = self._create_mover(48, 2, 4, 0)
+        self.world.process()
+        self.assertEqual(self.world.component_for_entity(mover_id, HitBox).x, 48)
+
+        self.world.delete_entity(self.wall_id)
+        mover_id = self._create_mover(8, 2, 4, 0)
+        self.world.process()
+        self.assertEqual(self.world.component_for_entity(mover_id, HitBox).x, 12)
+
+    def test_movement_into_tile_wall_is_reverted(self):
+        bitmap = CollisionBitmap(8, 8, 16, 16)
+        bitmap.set_collider(0, 2, pygame.Rect(0, 0, 16, 16))
+        self.world.create_entity(bitmap)
+        mover_id = self._create_mover(2, 20, 0, 4)
+        self.world.process()
+        self.assertEqual(self.world.component_for_entity(mover_id, HitBox).y, 20)
+
+    def test_sweep_and_prune_finds_the_same_pairs_as_brute_force(self):
+        rng = random.Random(0)
+        hitboxes = {}
+        contacts = set()
+        for _ in range(60):
+            hitbox = HitBox(rng.randrange(200), rng.randrange(200), rng.randrange(0, 30), rng.randrange(0, 30))
+            hitboxes[self.world.create_entity(hitbox)] = hitbox
+
+        for _ in range(3):
+            for hitbox in hitboxes.values():
+                hitbox.move_ip(rng.randrange(-3, 4), rng.randrange(-3, 4))
+            self.world.process()
+            for event in self._pop_events():
+                if isinstance(event, CollisionEvent):
+                    contacts.add(frozenset((event.ent_1, event.ent_2)))
+                elif isinstance(event, CollisionExitEvent):
+                    contacts.remove(frozenset((event.ent_1, event.ent_2)))
+            items = list(hitboxes.items())
+            expected = {frozenset((ent_1, ent_2)) for idx, (ent_1, hb_1) in enumerate(items)
+                        for ent_2, hb_2 in items[idx + 1:] if hb_1.colliderect(hb_2)}
+            self.assertEqual(contacts, expected)
+
+    def test_contact_events(self):
+        self.collision_system.stay_event_interval = 2
+        hitbox = HitBox(0, 50, 10, 10)
+        ent_1 = self.world.create_entity(hitbox)
+        ent_2 = self.world.create_entity(HitBox(5, 50, 10, 10))
+        events_per_frame = []
+        for frame in range(5):
+            if frame == 4:
+                hitbox.move_ip(-20, 0)
+            self.world.process()
+            events_per_frame.append(self._pop_events())
+        self.assertEqual(events_per_frame, [[CollisionEvent(ent_1, ent_2)], [], [CollisionStayEvent(ent_1, ent_2, 2)], [],
+                                            [CollisionExitEvent(ent_1, ent_2)]])
+
+    def test_respawned_entity_starts_a_new_contact(self):
+        pool = self.world.get_entity_pool('bullet', lambda: (HitBox(0, 50, 10, 10),),
+                                          lambda components: components[0].update(0, 50, 10, 10))
+        target = self.world.create_entity(HitBox(5, 50, 10, 10))
+        bullet = pool.spawn()
+        self.world.process()
+        self.assertEqual(self._pop_events(), [CollisionEvent(target, bullet)])
+
+        self.world.delete_entity(bullet)
+        self.world.process()  # Deleted before the system runs, so no exit event is left for the reused id
+        self.assertEqual(self._pop_events(), [])
+        self.assertEqual(pool.spawn(), bullet)
+        self.world.process()
+        self.assertEqual(self._pop_events(), [CollisionEvent(target, bullet)])
+
+    def test_pairs_with_non_matching_layers_are_skipped(self):
+        enemy_mask = CollisionLayer.PLAYER | CollisionLayer.DEFAULT
+        enemy_1 = self.world.create_entity(HitBox(0, 50, 10, 10, category=CollisionLayer.ENEMY, mask=enemy_mask))
+        self.world.create_entity(HitBox(0, 45, 10, 10, category=CollisionLayer.ENEMY, mask=enemy_mask))
+        player = self.world.create_entity(HitBox(0, 55, 10, 10, category=CollisionLayer.PLAYER))
+        self.world.process()
+        events = self._pop_events()
+        self.assertEqual(events, [CollisionEvent(enemy_1, player)])
+
+    @unittest.skipUnless(np, 'NumPy is not installed')
+    def test_batched_and_sequential_wall_resolution_agree(self):
+        final_positions = []
+        for batch_walls in (False, True):
+            rng = random.Random(0)
+            world = zesper.World(ResourceManager(), EventQueue())
+            world.add_processor(CollisionSystem(batch_walls=batch_walls))
+            bitmap = CollisionBitmap(16, 16, 16, 16)
+            walls = []
+            for _ in range(30):
+                bitmap.set_collider(rng.randrange(16), rng.randrange(16), pygame.Rect(0, 0, 16, rng.choice((8, 16))))
+                walls.append(HitBox(rng.randrange(256), rng.randrange(256), rng.randrange(4, 30), rng.randrange(4, 30),
+                                    impenetrable=True))
+            world.create_entity(bitmap)
+            for wall in walls:
+                world.create_entity(wall)
+
+            hitboxes = []
+            while len(hitboxes) < 40:
+                start = pygame.Rect(rng.randrange(256), rng.randrange(256), 10, 10)
+                if start.collidelist(walls) == -1 and not bitmap.colliding_rects(start):
+                    position = Position(start.x, start.y)
+                    position.move_ip(rng.randrange(-4, 5), rng.randrange(-4, 5))
+                    hitbox = HitBox(round(position.x), round(position.y), 10, 10)
+                    world.create_entity(hitbox, position, Velocity(position.x - start.x, position.y - start.y))
+                    hitboxes.append(hitbox)
+            world.process()
+            final_positions.append([hitbox.topleft for hitbox in hitboxes])
+
+        self.assertEqual(final_positions[0], final_positions[1])
+
+    def test_every_matching_response_is_called(self):
+        responses = []
+        self.collision_system.register_response(Weapon, Health, lambda *args: responses.append(args))
+        weapon = Weapon(damage=1)
+        attacker = self.world.create_entity(HitBox(0, 50, 10, 10), weapon)
+        victim = self.world.create_entity(HitBox(5, 50, 10, 10), Health())
+        self.world.process()
+        self.collision_system.on_collision(*self._pop_events())
+        self.assertEqual(self._pop_events(), [DamageEvent(victim, attacker)])
+        self.assertEqual(responses, [(attacker, weapon, victim, self.world.component_for_entity(victim, Health))])
+
+
+if __name__ == '__main__':
+    unittest.main()
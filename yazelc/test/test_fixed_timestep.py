@@ -0,0 +1,82 @@
+import unittest
+
+import pygame
+
+pygame.init()
+
+from yazelc.camera import Camera
+from yazelc.components import Position, Velocity
+from yazelc.controller import Controller
+from yazelc.scenes.base_scene import BaseScene
+from yazelc.systems.movement_system import MovementSystem
+from yazelc.systems.render_system import _interpolate
+from yazelc.utils.fixed_timestep import FixedTimestep
+
+
+class IdleController(Controller):
+    def process_input(self):
+        pass
+
+    def is_button_down(self, button) -> bool:
+        return False
+
+    def is_button_pressed(self, button) -> bool:
+        return False
+
+    def is_button_released(self, button) -> bool:
+        return False
+
+
+class SteppedScene(BaseScene):
+    def on_enter(self):
+        pass
+
+    def on_exit(self):
+        pass
+
+
+class TestFixedTimestep(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.clock = FixedTimestep(steps_per_second=10, max_steps=3)
+        self.clock.restart(now=0)
+
+    def test_steps_and_interpolation(self):
+        self.assertEqual(self.clock.tick(now=0.05), 1)  # One step due after restarting
+        self.assertAlmostEqual(self.clock.interpolation, 0.5)
+        self.assertEqual(self.clock.tick(now=0.08), 0)
+        self.assertAlmostEqual(self.clock.interpolation, 0.8)
+        self.assertEqual(self.clock.tick(now=0.31), 3)
+        self.assertAlmostEqual(self.clock.interpolation, 0.1)
+        self.assertEqual(self.clock.caught_up_steps, 2)
+        self.assertEqual(self.clock.dropped_steps, 0)
+
+    def test_hitch_drops_steps(self):
+        self.assertEqual(self.clock.tick(now=1.05), 3)
+        self.assertEqual(self.clock.dropped_steps, 8)
+        self.assertAlmostEqual(self.clock.interpolation, 0.5)
+
+
+class TestSteppedPositions(unittest.TestCase):
+
+    def test_positions_not_moved_on_a_step_are_not_interpolated(self):
+        scene = SteppedScene(pygame.Surface((8, 8)), IdleController())
+        position = Position(0, 0)
+        scene.world.create_entity(position, Velocity(2, 0))
+        scene.world.add_processor(MovementSystem())
+        scene.step()
+        self.assertEqual(_interpolate(position, 0.5), pygame.Vector2(1, 0))
+
+        scene.world.remove_processor(MovementSystem)  # E.g., on a pause
+        scene.step()
+        self.assertEqual(_interpolate(position, 0.5), pygame.Vector2(2, 0))
+
+    def test_still_camera_is_not_interpolated(self):
+        camera = Camera(0, 0)
+        camera.prev_pos = Position(10, 10)
+        camera.update(None)
+        self.assertEqual(camera.interpolated_pos(0.5), pygame.Vector2(0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import tempfile
 import unittest
 
 import pygame
@@ -5,9 +6,32 @@ import pygame
 pygame.init()
 pygame.freetype.init()
 
-from yazelc.map import WorldMap
+from yazelc.components import CollisionBitmap, HitBox
+from yazelc.map import Map, WorldMap, merge_rects
+from yazelc.resource_manager import ResourceManager
 from pathlib import Path
 
+WALL_TILESET = '''<?xml version="1.0" encoding="UTF-8"?>
+<tileset name="walls" tilewidth="16" tileheight="16" tilecount="1" columns="0">
+ <tile id="0">
+  <objectgroup draworder="index" id="2"><object id="1" x="0" y="0" width="16" height="16"/></objectgroup>
+ </tile>
+</tileset>
+'''
+
+WALL_MAP = '''<?xml version="1.0" encoding="UTF-8"?>
+<map version="1.10" orientation="orthogonal" renderorder="right-down" width="4" height="3" tilewidth="16" tileheight="16">
+ <tileset firstgid="1" source="walls.tsx"/>
+ <layer id="1" name="ground" width="4" height="3">
+  <data encoding="csv">
+1,1,1,0,
+1,1,1,0,
+0,0,0,1
+</data>
+ </layer>
+</map>
+'''
+
 
 class TestMap(unittest.TestCase):
     TEST_WORLD = Path('../../data/overworld/overworld.world')
@@ -33,3 +57,25 @@ class TestMap(unittest.TestCase):
             Path('../../assets/sprites/map/books_and_treasures.png').resolve(),
         ]
         self.assertCountEqual(resolved_image_paths, expected_image_paths)
+
+    def test_merge_rects(self):
+        wall = [pygame.Rect(x, y, 16, 16) for x in range(0, 64, 16) for y in range(0, 32, 16)]
+        isolated_tile = pygame.Rect(160, 0, 16, 16)
+        thin_colliders = [pygame.Rect(x, 100, 16, 8) for x in range(0, 48, 16)]
+        merged_rects = merge_rects(wall + [isolated_tile] + thin_colliders)
+        self.assertCountEqual(merged_rects, [pygame.Rect(0, 0, 64, 32), isolated_tile, pygame.Rect(0, 100, 48, 8)])
+
+    def test_wall_components_of_the_collision_flags(self):
+        with tempfile.TemporaryDirectory() as map_dir:
+            Path(map_dir, 'walls.tsx').write_text(WALL_TILESET)
+            Path(map_dir, 'walls.tmx').write_text(WALL_MAP)
+            wall_map = Map(Path(map_dir, 'walls.tmx'), ResourceManager())
+
+        walls = wall_map.create_wall_components(collision_bitmap=False, merge=False)
+        self.assertEqual(len(walls), 7)
+        merged_walls = wall_map.create_wall_components(collision_bitmap=False, merge=True)
+        self.assertCountEqual([hitbox for hitbox, in merged_walls], [HitBox(0, 0, 48, 32), HitBox(48, 32, 16, 16)])
+        for merge in (False, True):  # The tile colliders are only on the bitmap
+            (bitmap,), = wall_map.create_wall_components(collision_bitmap=True, merge=merge)
+            self.assertIsInstance(bitmap, CollisionBitmap)
+            self.assertCountEqual(bitmap.colliding_rects(pygame.Rect(0, 0, 64, 48)), [hitbox for hitbox, in walls])
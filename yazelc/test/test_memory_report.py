@@ -0,0 +1,30 @@
+import unittest
+
+import pygame
+
+pygame.init()
+
+from yazelc.utils.memory_report import component_report, typical_enemy_components
+
+
+class TestMemoryReport(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.components = typical_enemy_components()
+
+    def test_components_have_no_instance_dictionary(self):
+        for component in self.components:
+            self.assertFalse(hasattr(component, '__dict__'), type(component).__name__)
+
+    def test_slots_take_less_memory_than_dictionaries(self):
+        names = ['Position', 'Velocity', 'HitBox', 'Renderable', 'Animation', 'Brain', 'Health', 'Weapon', 'Enemy', 'State']
+        slotted = component_report(self.components)
+        unslotted = component_report(self.components, unslotted=True)
+        self.assertEqual(list(slotted), names)
+        self.assertEqual(list(unslotted), names)
+        for name in names:
+            self.assertLess(slotted[name], unslotted[name], name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import unittest
+
+import pygame
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # The system flips the display
+pygame.init()
+
+from yazelc import zesper
+from yazelc.components import BlendEffect, Particle, Position, Renderable, Velocity
+from yazelc.event.event_queue import EventQueue
+from yazelc.resource_manager import ResourceManager
+from yazelc.systems.render_system import RenderSystem
+
+
+class TestRenderSystem(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.world = zesper.World(ResourceManager(), EventQueue())
+        pygame.display.init()
+        self.window = pygame.display.set_mode((8, 8))
+        self.world.add_processor(RenderSystem(self.window))
+
+    def _create_sprite(self, color: pygame.Color, depth: int) -> int:
+        image = pygame.Surface((4, 4))
+        image.fill(color)
+        return self.world.create_entity(Renderable(image, depth), Position(0, 0))
+
+    def _top_color(self) -> pygame.Color:
+        self.world.process()
+        return self.window.get_at((0, 0))
+
+    def test_sprites_are_drawn_in_order_of_depth(self):
+        red, green, blue = pygame.Color(255, 0, 0), pygame.Color(0, 255, 0), pygame.Color(0, 0, 255)
+        red_sprite = self._create_sprite(red, 200)
+        self._create_sprite(green, 100)
+        self.assertEqual(self._top_color(), red)
+
+        blue_sprite = self._create_sprite(blue, 300)  # Added after the buckets were built
+        self.assertEqual(self._top_color(), blue)
+
+        self.world.component_for_entity(red_sprite, Renderable).depth = 400
+        self._top_color()  # The bucket of the sprite is updated after the frame
+        self.assertEqual(self._top_color(), red)
+
+        self.world.disable_component(red_sprite, Position)
+        self.assertEqual(self._top_color(), blue)
+        self.world.delete_entity(blue_sprite)
+        self.assertEqual(self._top_color(), green)
+        self.world.enable_component(red_sprite, Position)
+        self.assertEqual(self._top_color(), red)
+
+    def test_sprites_and_particles_off_the_view_are_culled(self):
+        render_system = self.world.get_processor(RenderSystem)
+        red, green = pygame.Color(255, 0, 0), pygame.Color(0, 255, 0)
+        self._create_sprite(green, 100)
+        moving_sprite = self._create_sprite(red, 200)
+        self.world.add_component(moving_sprite, Velocity())
+        self.world.component_for_entity(moving_sprite, Position).update(100, 100)
+        self.world.create_entity(Particle(red), Position(1, 1))
+        self.world.create_entity(Particle(red), Position(100, 1))
+        hidden_sprite = self._create_sprite(red, 300)
+        self.world.disable_component(hidden_sprite, Renderable)  # Neither drawn nor culled
+        self.assertEqual(self._top_color(), green)
+        self.assertEqual((render_system.drawn_sprites, render_system.culled_sprites), (1, 1))
+        self.assertEqual((render_system.drawn_particles, render_system.culled_particles), (1, 1))
+
+        self.world.component_for_entity(moving_sprite, Position).update(0, 0)
+        self.assertEqual(self._top_color(), red)
+        self.assertEqual((render_system.drawn_sprites, render_system.culled_sprites), (2, 0))
+
+    def test_blend_effect_frames_are_cached(self):
+        render_system = self.world.get_processor(RenderSystem)
+        render_system.TINT_CACHE_SIZE = 1
+        image = pygame.Surface((4, 4))
+        image.fill(pygame.Color(255, 255, 255))
+        rend = Renderable(image)
+        first_enemy = self.world.create_entity(rend, Position(0, 0), BlendEffect(10, blink_interval=2))
+        second_enemy = self.world.create_entity(Renderable(image), Position(0, 0), BlendEffect(10, blink_interval=2))
+        first_image = render_system._get_image(first_enemy, rend)
+        self.assertIs(render_system._get_image(second_enemy, rend), first_image)
+        render_system._tick_blend_effects()
+        self.assertNotEqual(first_image.get_at((0, 0)), render_system._get_image(first_enemy, rend).get_at((0, 0)))
+        self.assertEqual(len(render_system._tint_cache), 1)  # The other flash colour evicted the first one
+        self.assertIsNot(render_system._get_image(second_enemy, rend), first_image)
+
+    def test_blend_effects_of_culled_sprites_run_out(self):
+        image = pygame.Surface((4, 4))
+        enemy = self.world.create_entity(Renderable(image), Position(100, 100), BlendEffect(2))
+        for _ in range(3):
+            self.world.process()
+        self.assertIsNone(self.world.try_component(enemy, BlendEffect))
+
+    def test_dirty_rects_match_full_redraw(self):
+        windows = []
+        for dirty_rects in (False, True):
+            world = zesper.World(ResourceManager(), EventQueue())
+            world.add_processor(RenderSystem(self.window, dirty_rects=dirty_rects))
+            strip = [pygame.Surface((3, 3)) for _ in range(2)]
+            strip[0].fill(pygame.Color(255, 0, 0))
+            strip[1].fill(pygame.Color(0, 255, 0))
+            background = pygame.Surface((8, 8))
+            background.fill(pygame.Color(0, 0, 255))
+            world.create_entity(Renderable(background, 0), Position(0, 0))
+            sprite = world.create_entity(Renderable(strip[0], 100), Position(0, 0))
+            other_sprite = world.create_entity(Renderable(strip[1], 200), Position(5, 5))
+            particle = world.create_entity(Particle(pygame.Color(255, 255, 255)), Position(6, 1))
+
+            frames = []
+            for frame in range(5):
+                world.component_for_entity(sprite, Position).update(frame, frame // 2)
+                world.component_for_entity(sprite, Renderable).image = strip[frame % 2]
+                if frame == 2:
+                    world.delete_entity(other_sprite)
+                    world.delete_entity(particle)
+                world.process()
+                frames.append(pygame.image.tobytes(self.window, 'RGB'))
+            windows.append(frames)
+
+        self.assertEqual(windows[0], windows[1])
+
+    def test_dirty_rects_of_a_respawned_sprite(self):
+        world = zesper.World(ResourceManager(), EventQueue())
+        world.add_processor(RenderSystem(self.window, dirty_rects=True))
+        red, green = pygame.Color(255, 0, 0), pygame.Color(0, 255, 0)
+        red_image, green_image = pygame.Surface((3, 3)), pygame.Surface((3, 3))
+        red_image.fill(red)
+        green_image.fill(green)
+        pool = world.get_entity_pool('sprite', lambda depth: (Renderable(red_image, depth), Position(0, 0)),
+                                     lambda components, depth: setattr(components[0], 'depth', depth))
+        sprite = pool.spawn(100)
+        world.create_entity(Renderable(green_image, 200), Position(0, 0))
+        world.process()
+        self.assertEqual(self.window.get_at((0, 0)), green)
+
+        world.delete_entity(sprite, immediate=True)
+        self.assertEqual(pool.spawn(300), sprite)  # Same id, image and place but above the other sprite
+        world.process()
+        self.assertEqual(self.window.get_at((0, 0)), red)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,303 @@
+import random
+import unittest
+
+import esper
+import pygame
+
+pygame.init()
+
+from yazelc import zesper
+from yazelc.event.event_queue import EventQueue
+from yazelc.resource_manager import ResourceManager
+from yazelc.utils.profiler import Stats
+
+
+class ComponentA:
+    pass
+
+
+class ComponentB:
+    pass
+
+
+class ComponentC:
+    pass
+
+
+class TestWorld(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.world = zesper.World(ResourceManager(), EventQueue())
+
+    def test_queries_match_esper(self):
+        rng = random.Random(0)
+        reference_world = esper.World()
+        component_types = (ComponentA, ComponentB, ComponentC)
+        entities = []
+        for _ in range(300):
+            action = rng.random()
+            if action < 0.2 or not entities:
+                components = [component_type() for component_type in component_types if rng.random() < 0.5]
+                entity = self.world.create_entity(*components)
+                self.assertEqual(entity, reference_world.create_entity(*components))
+                entities.append(entity)
+            elif action < 0.8:
+                entity, component_type = rng.choice(entities), rng.choice(component_types)
+                if self.world.has_component(entity, component_type) and rng.random() < 0.5:
+                    self.world.remove_component(entity, component_type)
+                    reference_world.remove_component(entity, component_type)
+                else:
+                    component = component_type()
+                    self.world.add_component(entity, component)
+                    reference_world.add_component(entity, component)
+            else:
+                entity = entities.pop(rng.randrange(len(entities)))
+                immediate = rng.random() < 0.5
+                self.world.delete_entity(entity, immediate)
+                reference_world.delete_entity(entity, immediate)
+                if rng.random() < 0.3:
+                    self.world.process()
+                    reference_world.process()
+
+            for query in ((ComponentA,), (ComponentB, ComponentA), (ComponentA, ComponentB, ComponentC)):
+                self.assertEqual(sorted((ent, tuple(comps)) for ent, comps in self.world.get_components(*query)),
+                                 sorted((ent, tuple(comps)) for ent, comps in reference_world.get_components(*query)))
+            self.assertEqual(sorted(self.world.get_component(ComponentC)), sorted(reference_world.get_component(ComponentC)))
+
+    def test_structural_changes_keep_unrelated_queries_cached(self):
+        entity = self.world.create_entity(ComponentA())
+        self.world.create_entity(ComponentB())
+        query_b = self.world.get_component(ComponentB)
+        query_a = self.world.get_component(ComponentA)
+        self.world.add_component(entity, ComponentC())
+        self.assertIs(self.world.get_component(ComponentB), query_b)
+        self.assertIsNot(self.world.get_component(ComponentA), query_a)
+        self.assertEqual(self.world.get_signature(entity), frozenset((ComponentA, ComponentC)))
+
+    def test_bulk_creation(self):
+        added = []
+        self.world.add_component_listener(ComponentB, lambda ent, comp: added.append(ent), lambda ent, comp: None)
+        query_a = self.world.get_component(ComponentA)
+        query_c = self.world.get_component(ComponentC)
+        entities = self.world.create_entities([(ComponentA(),), (ComponentA(), ComponentB()), (ComponentB(),)])
+        prefab = lambda n_components: (ComponentA(), ComponentB())[:n_components]  # noqa
+        prefab_entities = self.world.create_entities_from_prefab(prefab, [(1,), (2,)])
+
+        self.assertEqual(entities + prefab_entities, [1, 2, 3, 4, 5])
+        self.assertEqual(added, [2, 3, 5])
+        self.assertIsNot(self.world.get_component(ComponentA), query_a)
+        self.assertIs(self.world.get_component(ComponentC), query_c)
+        self.assertEqual(sorted(ent for ent, _ in self.world.get_component(ComponentA)), [1, 2, 4, 5])
+        self.assertEqual(self.world.get_signature(5), frozenset((ComponentA, ComponentB)))
+
+    def test_component_masks(self):
+        component_a, component_b = ComponentA(), ComponentB()
+        entity_a = self.world.create_entity(component_a)
+        entity_ab = self.world.create_entity(ComponentA(), component_b)
+        mask_ab = self.world.component_mask(ComponentA, ComponentB)
+        self.assertEqual(self.world.get_mask(entity_ab), mask_ab)
+        self.assertTrue(self.world.has_components(entity_ab, ComponentB, ComponentA))
+        self.assertFalse(self.world.has_mask(entity_a, mask_ab))
+
+        self.assertEqual(self.world.try_pair_signature(entity_ab, entity_a, ComponentA, ComponentB),
+                         (entity_a, component_a, entity_ab, component_b))
+        self.assertEqual(self.world.try_signature(entity_a, entity_ab, ComponentB), (entity_ab, component_b, entity_a))
+        self.assertIsNone(self.world.try_signature(entity_a, entity_a, ComponentC))
+
+        self.world.remove_component(entity_ab, ComponentA)
+        self.assertEqual(self.world.get_mask(entity_ab), self.world.component_mask(ComponentB))
+
+    def test_disabled_components_are_skipped_by_queries(self):
+        entity = self.world.create_entity(ComponentA(), ComponentB())
+        other_entity = self.world.create_entity(ComponentA())
+        query_a = self.world.get_component(ComponentA)
+        query_ab = self.world.get_components(ComponentA, ComponentB)
+
+        self.world.disable_component(entity, ComponentB)
+        self.assertFalse(self.world.is_enabled(entity, ComponentB))
+        self.assertIs(self.world.get_component(ComponentA), query_a)
+        self.assertEqual(self.world.get_components(ComponentA, ComponentB), [])
+        self.assertIs(self.world._get_components_cache[(ComponentA, ComponentB)], query_ab)  # Still cached
+        self.assertTrue(self.world.has_component(entity, ComponentB))
+
+        self.world.enable_component(entity, ComponentB)
+        self.assertIs(self.world.get_components(ComponentA, ComponentB), query_ab)
+
+        self.world.disable_component(other_entity, ComponentA)
+        self.assertEqual([ent for ent, _ in self.world.get_component(ComponentA)], [entity])
+        self.world.add_component(other_entity, ComponentA())  # Replacing enables it again
+        self.assertEqual(len(self.world.get_component(ComponentA)), 2)
+
+        self.world.disable_component(entity, ComponentA)
+        self.world.delete_entity(entity, immediate=True)
+        self.assertEqual(self.world._disabled_types, 0)
+        with self.assertRaises(KeyError):
+            self.world.disable_component(other_entity, ComponentC)
+
+    def test_command_buffer_is_flushed_after_each_processor(self):
+        world = self.world
+        entity = world.create_entity(ComponentA())
+
+        class RecordingProcessor(zesper.Processor):
+            def process(self):
+                for ent, _ in self.world.get_component(ComponentA):
+                    self.world.commands.remove_component(ent, ComponentA)
+                    self.world.commands.remove_component(ent, ComponentA)  # Already removed when applied
+                    self.world.commands.add_component(ent, ComponentB())
+                self.world.commands.create_entity(ComponentC())
+
+        class CheckingProcessor(zesper.Processor):
+            def process(self):
+                self.seen = [ent for ent, _ in self.world.get_component(ComponentB)]
+
+        checking_processor = CheckingProcessor()
+        world.add_processor(RecordingProcessor(), priority=1)
+        world.add_processor(checking_processor)
+        world.process()
+        self.assertEqual(checking_processor.seen, [entity])
+        self.assertEqual(len(world.get_component(ComponentC)), 1)
+        self.assertEqual(world.flushed_commands, 4)
+
+        world.commands.delete_entity(entity)
+        world.process()
+        self.assertFalse(world.entity_exists(entity))
+        self.assertEqual(world.flushed_commands, 2)
+
+    def test_buffered_commands_move_each_entity_once(self):
+        added = []
+        self.world.add_component_listener(ComponentC, lambda ent, comp: added.append(ent), lambda ent, comp: None)
+        entity = self.world.create_entity(ComponentA())
+        doomed_entity = self.world.create_entity(ComponentA())
+        commands = self.world.commands
+        commands.add_component(entity, ComponentB())
+        commands.add_component(entity, ComponentC())
+        commands.remove_component(entity, ComponentA)
+        created_entity = commands.create_entity(ComponentA())
+        commands.add_component(created_entity, ComponentB())
+        commands.add_component(doomed_entity, ComponentC())
+        commands.delete_entity(doomed_entity)
+        self.assertEqual(commands.flush(), 7)
+
+        signatures = {archetype.signature for archetype in self.world._archetypes.values()}
+        self.assertEqual(signatures, {frozenset({ComponentA}), frozenset({ComponentB, ComponentC}),
+                                      frozenset({ComponentA, ComponentB})})  # No intermediate archetypes
+        self.assertEqual(added, [entity])
+        self.assertEqual(self.world.get_signature(created_entity), frozenset({ComponentA, ComponentB}))
+        self.assertFalse(self.world.entity_exists(doomed_entity))
+        self.assertFalse(self.world.has_component(doomed_entity, ComponentC))
+
+    def test_entity_pool_reuses_ids_and_components(self):
+        added, removed = [], []
+        self.world.add_component_listener(ComponentA, lambda ent, comp: added.append(ent),
+                                          lambda ent, comp: removed.append(ent))
+        resets = []
+        pool = self.world.get_entity_pool('test', lambda: (ComponentA(), ComponentB()),
+                                          lambda components: resets.append(components))
+        entity = pool.spawn()
+        components = self.world.components_for_entity(entity)
+        self.world.remove_component(entity, ComponentB)
+        self.world.delete_entity(entity)
+        self.assertEqual(len(pool), 0)  # Only recycled once the world removes it
+        self.world.process()
+        self.assertEqual(len(pool), 1)
+
+        recycled_entity = pool.spawn()
+        self.assertEqual(recycled_entity, entity)
+        self.assertEqual(resets, [components])  # Components removed during its life are reused as well
+        self.assertEqual(self.world.get_signature(entity), frozenset((ComponentA, ComponentB)))
+        self.assertEqual(added, [entity, entity])
+        self.assertEqual(removed, [entity])
+        self.assertNotEqual(pool.spawn(), entity)
+
+    def test_rendering_processors_run_apart_from_the_simulation(self):
+        class CountingProcessor(zesper.Processor):
+            def __init__(self, simulated: bool):
+                self.simulated = simulated
+                self.calls = 0
+
+            def process(self):
+                self.calls += 1
+
+        simulation_processor, render_processor = CountingProcessor(True), CountingProcessor(False)
+        self.world.add_processor(simulation_processor)
+        self.world.add_processor(render_processor)
+        self.world.simulate()
+        self.world.simulate()
+        self.world.render(0.25)
+        self.assertEqual((simulation_processor.calls, render_processor.calls), (2, 1))
+        self.assertEqual(self.world.interpolation, 0.25)
+        self.world.process()
+        self.assertEqual((simulation_processor.calls, render_processor.calls), (3, 2))
+        self.assertEqual(self.world.interpolation, 1)
+
+        render_processor.interval = 2  # Counted in displayed frames, however many steps run in between
+        for steps in (0, 0, 2, 0):
+            for _ in range(steps):
+                self.world.simulate()
+            self.world.render(0.5)
+        self.assertEqual(render_processor.calls, 4)
+
+    def test_processor_scheduling(self):
+        class EventOnlyProcessor(zesper.Processor):
+            def on_event(self, _event):
+                pass
+
+        class SlicedProcessor(zesper.Processor):
+            interval = 2
+            slices = 3
+
+            def __init__(self):
+                self.runs = []
+
+            def process(self):
+                self.runs.append([ent for ent, _ in self.sliced(self.world.get_component(ComponentA))])
+
+        sliced_processor = SlicedProcessor()
+        self.world.add_processor(EventOnlyProcessor())
+        self.world.add_processor(sliced_processor)
+        entities = [self.world.create_entity(ComponentA()) for _ in range(7)]
+        for _ in range(12):
+            self.world.process()
+
+        self.assertEqual(len(sliced_processor.runs), 6)
+        self.assertEqual(sorted(sum(sliced_processor.runs[:3], [])), entities)  # Every entity once per 6 frames
+        self.assertEqual(sliced_processor.runs[:3], sliced_processor.runs[3:])
+        self.assertEqual(sliced_processor.frames_per_run, 6)
+
+    def test_event_only_systems_are_skipped(self):
+        from yazelc.systems.delayed_entity_removal_system import EntityRemovalSystem
+        from yazelc.systems.hud_system import HudSystem
+        from yazelc.systems.inventory_system import InventorySystem
+        from yazelc.systems.sound_system import SoundSystem
+
+        for system in (EntityRemovalSystem(), HudSystem(0), InventorySystem(0, {}), SoundSystem()):
+            self.world.add_processor(system)
+        self.world.enable_profiling()
+        self.world.process()
+        self.assertEqual(self.world.profiler.processor_times, {})
+
+    def test_profiling(self):
+        class QueryProcessor(zesper.Processor):
+            def process(self):
+                self.world.get_components(ComponentA, ComponentB)
+
+        self.world.add_processor(QueryProcessor())
+        self.world.create_entity(ComponentA(), ComponentB())
+        self.world.enable_profiling(n_frames=4)
+        for _ in range(6):
+            self.world.process()
+        self.assertEqual(len(self.world.profiler.processor_times['QueryProcessor']), 4)
+        self.assertEqual(self.world.profiler.query_stats()[(ComponentA, ComponentB)], Stats(1, 1, 1, 1))
+
+        self.world.disable_profiling()
+        self.world.process()
+        self.assertIsNone(self.world.profiler)
+        self.assertNotIn('get_components', vars(self.world))
+
+    def test_stats(self):
+        stats = Stats.from_samples(range(100, 0, -1))
+        self.assertEqual(stats, Stats(1, 50.5, 95, 99))
+
+
+if __name__ == '__main__':
+    unittest.main()
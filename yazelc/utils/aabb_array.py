@@ -0,0 +1,98 @@
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+import pygame
+
+
+def to_bounds(rects: Iterable[pygame.Rect]) -> np.ndarray:
+    """ Array of rows (left, top, right, bottom) of the rectangles """
+    bounds = [(rect.left, rect.top, rect.right, rect.bottom) for rect in rects]
+    return np.array(bounds, dtype=np.int32).reshape(-1, 4)
+
+
+def to_padded_bounds(rect_lists: Sequence[Sequence[pygame.Rect]]) -> np.ndarray:
+    """
+    Array (lists x length of the longest list x 4) with the bounds of each list of rectangles. Shorter lists are padded
+    with empty rectangles, which never overlap anything
+    """
+    counts = np.array([len(rects) for rects in rect_lists], dtype=np.intp)
+    bounds = np.zeros((len(rect_lists), counts.max(initial=0), 4), dtype=np.int32)
+    flat_bounds = to_bounds(rect for rects in rect_lists for rect in rects)
+    rows = np.repeat(np.arange(len(rect_lists)), counts)
+    columns = np.arange(len(flat_bounds)) - np.repeat(np.cumsum(counts) - counts, counts)
+    bounds[rows, columns] = flat_bounds
+    return bounds
+
+
+def tile_bounds(cells: np.ndarray, shape_bounds: np.ndarray, tile_size: tuple[int, int], bounds: np.ndarray) -> np.ndarray:
+    """
+    Array (rectangles x colliders x 4) with the colliders of the tiles touched by each rectangle. The cells are the grid
+    (rows x columns) of the shape index of each tile, zero meaning no collider, and the shape bounds (shapes x colliders
+    per shape x 4) are relative to the tile origin, the first shape being empty. Rectangles touching fewer tiles than
+    others are padded with empty rectangles
+    """
+    (rows, columns), (tile_width, tile_height) = cells.shape, tile_size
+    first_x, first_y = bounds[:, 0] // tile_width, bounds[:, 1] // tile_height
+    last_x = np.maximum(bounds[:, 0], bounds[:, 2] - 1) // tile_width
+    last_y = np.maximum(bounds[:, 1], bounds[:, 3] - 1) // tile_height
+    tile_x = first_x[:, np.newaxis, np.newaxis] + np.arange((last_x - first_x).max(initial=0) + 1)
+    tile_y = first_y[:, np.newaxis, np.newaxis] + np.arange((last_y - first_y).max(initial=0) + 1)[:, np.newaxis]
+    tile_x, tile_y = np.broadcast_arrays(tile_x, tile_y)  # (rectangles, tile rows, tile columns)
+    is_touched = ((tile_x <= last_x[:, np.newaxis, np.newaxis]) & (tile_y <= last_y[:, np.newaxis, np.newaxis]) &
+                  (tile_x >= 0) & (tile_y >= 0) & (tile_x < columns) & (tile_y < rows))
+    shape_indices = np.where(is_touched, cells[tile_y.clip(0, rows - 1), tile_x.clip(0, columns - 1)], 0)
+    tile_origins = np.stack((tile_x * tile_width, tile_y * tile_height) * 2, axis=-1)
+    colliders = shape_bounds[shape_indices] + tile_origins[..., np.newaxis, :]
+    return colliders.reshape(len(bounds), -1, 4)
+
+
+def overlaps(bounds: np.ndarray, other_bounds: np.ndarray) -> np.ndarray:
+    """
+    Tells (broadcasting both arrays of bounds against each other) which pairs of rectangles overlap. Overlaps are strict
+    as for pygame.Rect.colliderect so rectangles that only share an edge or have no area never overlap
+    """
+    overlap = ((bounds[..., 0] < other_bounds[..., 2]) & (other_bounds[..., 0] < bounds[..., 2]) &
+               (bounds[..., 1] < other_bounds[..., 3]) & (other_bounds[..., 1] < bounds[..., 3]))
+    return overlap & _has_area(bounds) & _has_area(other_bounds)
+
+
+def _has_area(bounds: np.ndarray) -> np.ndarray:
+    return (bounds[..., 0] < bounds[..., 2]) & (bounds[..., 1] < bounds[..., 3])
+
+
+class KeyedBounds:
+    """
+    Bounds of rectangles stored by (integer) key on a persistent array, such that they are not rebuilt on every query.
+    A removed row is filled with the last one, so the stored bounds stay contiguous
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._bounds = np.zeros((capacity, 4), dtype=np.int32)
+        self._keys = np.zeros(capacity, dtype=np.int64)
+        self._rows: dict[int, int] = {}
+
+    @property
+    def bounds(self) -> np.ndarray:
+        return self._bounds[:len(self._rows)]
+
+    @property
+    def keys(self) -> np.ndarray:
+        return self._keys[:len(self._rows)]
+
+    def insert(self, key: int, rect: pygame.Rect):
+        row = self._rows.setdefault(key, len(self._rows))
+        if row == len(self._bounds):
+            self._bounds = np.concatenate((self._bounds, np.zeros_like(self._bounds)))
+            self._keys = np.concatenate((self._keys, np.zeros_like(self._keys)))
+        self._bounds[row] = rect.left, rect.top, rect.right, rect.bottom
+        self._keys[row] = key
+
+    def remove(self, key: int):
+        row = self._rows.pop(key, None)
+        last_row = len(self._rows)
+        if row is not None and row != last_row:
+            self._bounds[row], self._keys[row] = self._bounds[last_row], self._keys[last_row]
+            self._rows[int(self._keys[row])] = row
+
+    def __len__(self) -> int:
+        return len(self._rows)
@@ -0,0 +1,46 @@
+import time
+from typing import Optional
+
+
+class FixedTimestep:
+    """
+    Accumulator of the elapsed wall time that tells how many simulation steps of fixed duration are due on each
+    displayed frame. What is left on the accumulator, as a fraction of a step, is the interpolation used to render the
+    state between the last two steps.
+
+    When more than max_steps are due (e.g., after a hitch) the extra ones are dropped, i.e., the game slows down instead
+    of spiralling trying to catch up. Steps run beyond the first one of a frame are counted as caught up
+    """
+
+    def __init__(self, steps_per_second: int, max_steps: int):
+        self.step_time = 1 / steps_per_second
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.caught_up_steps = 0
+        self.dropped_steps = 0
+        self._last_time: Optional[float] = None
+
+    def restart(self, now: Optional[float] = None):
+        """ Starts measuring from now with a single step due, e.g., after loading a scene """
+        self._last_time = time.perf_counter() if now is None else now
+        self.accumulator = self.step_time
+
+    def tick(self, now: Optional[float] = None) -> int:
+        """ Number of steps due since the last tick """
+        now = time.perf_counter() if now is None else now
+        if self._last_time is None:
+            self.restart(now)
+        self.accumulator += now - self._last_time
+        self._last_time = now
+
+        n_steps = int(self.accumulator / self.step_time)
+        self.accumulator -= n_steps * self.step_time
+        if n_steps > self.max_steps:
+            self.dropped_steps += n_steps - self.max_steps
+            n_steps = self.max_steps
+        self.caught_up_steps += max(n_steps - 1, 0)
+        return n_steps
+
+    @property
+    def interpolation(self) -> float:
+        return self.accumulator / self.step_time
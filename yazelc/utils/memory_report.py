@@ -0,0 +1,76 @@
+"""
+Memory footprint of the components of an entity. Run as a module to print the report of a typical enemy entity, with
+the bytes taken by the components with and without slots
+"""
+import sys
+from enum import Enum
+from typing import Any, Optional
+
+import pygame
+
+# Objects normally shared between entities, e.g., images, names or small integers, which are not counted
+SHARED_TYPES = (pygame.Surface, Enum, str, int, type, type(None))
+_HEAP_TYPE = 1 << 9  # Flag of the classes defined in Python (as opposed to the built-in ones)
+
+
+def deep_sizeof(obj: Any, seen: Optional[set[int]] = None, unslotted: bool = False) -> int:
+    """
+    Bytes of the object plus the ones of the objects it owns (attributes, slots and container items). If unslotted,
+    objects of classes declaring slots are measured as an equivalent object keeping the attributes on its dictionary
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen or isinstance(obj, SHARED_TYPES):
+        return 0
+    seen.add(id(obj))
+
+    slot_values = {slot: getattr(obj, slot) for cls in type(obj).__mro__ for slot in cls.__dict__.get('__slots__', ())
+                   if hasattr(obj, slot) and slot not in ('__dict__', '__weakref__')}
+    if unslotted and _declares_slots(type(obj)):
+        obj = _unslotted_equivalent(obj, slot_values)
+        slot_values = {}
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen, unslotted) + deep_sizeof(value, seen, unslotted) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen, unslotted) for item in obj)
+    if hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen, unslotted)
+    size += sum(deep_sizeof(value, seen, unslotted) for value in slot_values.values())
+    return size
+
+
+def component_report(components: tuple[Any, ...], unslotted: bool = False) -> dict[str, int]:
+    """ Bytes taken by each component of an entity """
+    return {type(component).__name__: deep_sizeof(component, unslotted=unslotted) for component in components}
+
+
+def typical_enemy_components() -> tuple[Any, ...]:
+    from yazelc import components as cmp
+    from yazelc.utils.game_utils import Direction, Status
+
+    strip = [pygame.Surface((16, 16)) for _ in range(4)]
+    return (cmp.Position(10.5, 20.5), cmp.Velocity(1, 0), cmp.HitBox(10, 20, 16, 16), cmp.Renderable(strip[0]),
+            cmp.Animation.from_delay(strip, 8), cmp.Brain(30), cmp.Health(), cmp.Weapon(), cmp.Enemy('jelly'),
+            cmp.State(Status.IDLE, Direction.DOWN))
+
+
+def _declares_slots(cls: type) -> bool:
+    return any('__slots__' in base.__dict__ for base in cls.__mro__ if base.__flags__ & _HEAP_TYPE)
+
+
+def _unslotted_equivalent(obj: Any, slot_values: dict[str, Any]) -> Any:
+    """ Instance of the built-in base of the object (without slots) with the slot values on its dictionary """
+    base = next(cls for cls in type(obj).__mro__ if not cls.__flags__ & _HEAP_TYPE)
+    equivalent = base.__new__(type(type(obj).__name__, (base,), {}))
+    vars(equivalent).update(slot_values)
+    return equivalent
+
+
+if __name__ == '__main__':
+    enemy_components = typical_enemy_components()
+    before, after = component_report(enemy_components, unslotted=True), component_report(enemy_components)
+    print(f'{"Component":<12}{"Unslotted":>10}{"Slotted":>9}')
+    for name in after:
+        print(f'{name:<12}{before[name]:>10}{after[name]:>9}')
+    print(f'{"Total":<12}{sum(before.values()):>10}{sum(after.values()):>9} bytes per entity')
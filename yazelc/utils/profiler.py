@@ -0,0 +1,59 @@
+from collections import deque
+from collections.abc import Hashable, Iterable
+from typing import NamedTuple
+
+
+class Stats(NamedTuple):
+    min: float
+    mean: float
+    p95: float
+    p99: float
+
+    @classmethod
+    def from_samples(cls, samples: Iterable[float]) -> 'Stats':
+        ordered = sorted(samples)
+        return cls(ordered[0], sum(ordered) / len(ordered), _percentile(ordered, 95), _percentile(ordered, 99))
+
+
+class FrameProfiler:
+    """
+    Keeps the measurements of the last frames, i.e., the wall time spent by each processor and the amount of entities
+    returned by each query, in fixed size ring buffers from which rolling statistics are computed
+    """
+    N_FRAMES = 300
+
+    def __init__(self, n_frames: int = N_FRAMES):
+        self.n_frames = n_frames
+        self.processor_times: dict[str, deque[float]] = {}  # In seconds
+        self.query_sizes: dict[Hashable, deque[int]] = {}
+        self._frame_query_sizes: dict[Hashable, int] = {}
+
+    def record_time(self, processor_name: str, seconds: float):
+        try:
+            self.processor_times[processor_name].append(seconds)
+        except KeyError:
+            self.processor_times[processor_name] = deque((seconds,), maxlen=self.n_frames)
+
+    def record_query(self, query: Hashable, size: int):
+        """ Only the size of the last call of each query on a frame is kept """
+        self._frame_query_sizes[query] = size
+
+    def end_frame(self):
+        for query, size in self._frame_query_sizes.items():
+            try:
+                self.query_sizes[query].append(size)
+            except KeyError:
+                self.query_sizes[query] = deque((size,), maxlen=self.n_frames)
+        self._frame_query_sizes.clear()
+
+    def processor_stats(self) -> dict[str, Stats]:
+        return {name: Stats.from_samples(times) for name, times in self.processor_times.items()}
+
+    def query_stats(self) -> dict[Hashable, Stats]:
+        return {query: Stats.from_samples(sizes) for query, sizes in self.query_sizes.items()}
+
+
+def _percentile(ordered_samples: list[float], percent: int) -> float:
+    """ Nearest rank percentile of the sorted samples """
+    rank = -(-percent * len(ordered_samples) // 100)  # Ceil division
+    return ordered_samples[max(rank, 1) - 1]
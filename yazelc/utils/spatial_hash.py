@@ -0,0 +1,73 @@
+from collections import defaultdict
+from collections.abc import Hashable, Iterator
+
+import pygame
+
+
+class SpatialHash:
+    """
+    Uniform grid that buckets rectangles by the cells they overlap.
+
+    Each rectangle is stored under a key (normally the entity id) in every cell it touches. Querying a region only
+    looks at the few cells that overlap it, so the cost does not depend on the total amount of stored rectangles.
+    The stored rectangles are assumed to be static. If one of them moves it has to be moved (or inserted) again
+    """
+
+    def __init__(self, cell_size: int):
+        self.cell_size = cell_size
+        self._cells: defaultdict[tuple[int, int], dict[Hashable, pygame.Rect]] = defaultdict(dict)
+        self._cells_of_key: dict[Hashable, list[tuple[int, int]]] = {}
+
+    def insert(self, key: Hashable, rect: pygame.Rect):
+        if key in self._cells_of_key:
+            self.remove(key)
+        cells = list(self._cells_overlapping(rect))
+        for cell in cells:
+            self._cells[cell][key] = rect
+        self._cells_of_key[key] = cells
+
+    def move(self, key: Hashable, rect: pygame.Rect):
+        """ Updates the rectangle of the key, only touching other cells when it crosses into them """
+        cells = self._cells_of_key.get(key)
+        size = self.cell_size
+        if cells is None or cells[0] != (rect.left // size, rect.top // size) or \
+                cells[-1] != (max(rect.left, rect.right - 1) // size, max(rect.top, rect.bottom - 1) // size):
+            self.insert(key, rect)
+            return
+        for cell in cells:
+            self._cells[cell][key] = rect
+
+    def remove(self, key: Hashable):
+        for cell in self._cells_of_key.pop(key, ()):
+            bucket = self._cells[cell]
+            bucket.pop(key, None)
+            if not bucket:
+                del self._cells[cell]
+
+    def query(self, rect: pygame.Rect) -> dict[Hashable, pygame.Rect]:
+        """ Returns the stored rectangles (keyed) on the cells touched by the input rect. They may not overlap it """
+        candidates = {}
+        cells = self._cells
+        for cell in self._cells_overlapping(rect):
+            if cell in cells:
+                candidates.update(cells[cell])
+        return candidates
+
+    def clear(self):
+        self._cells.clear()
+        self._cells_of_key.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._cells_of_key
+
+    def __len__(self) -> int:
+        return len(self._cells_of_key)
+
+    def _cells_overlapping(self, rect: pygame.Rect) -> Iterator[tuple[int, int]]:
+        # A rect spans [left, right) so the last touched pixel is right - 1 (also valid for zero sized rects)
+        size = self.cell_size
+        x_min, y_min = rect.left // size, rect.top // size
+        x_max, y_max = max(rect.left, rect.right - 1) // size, max(rect.top, rect.bottom - 1) // size
+        for cell_x in range(x_min, x_max + 1):
+            for cell_y in range(y_min, y_max + 1):
+                yield cell_x, cell_y
@@ -1,11 +1,13 @@
 class Timer:
+    __slots__ = ('_time', '_counter')
+
     def __init__(self, time: int = 0):
         self._time = time
         self._counter = time
 
-    def tick(self):
+    def tick(self, frames: int = 1):
         if self._counter > 0:
-            self._counter -= 1
+            self._counter = max(self._counter - frames, 0)
 
     def reset(self):
         self._counter = self._time
@@ -7,14 +7,22 @@ from yazelc import zesper
 
 
 def create_explosion(position: tuple[int, int], n_particles: int, max_vel: int, color: Color, world: zesper.World):
+    particle_pool = world.get_entity_pool('particle', _new_particle, _reset_particle)
     for _ in range(n_particles):
         absolute_vel = max_vel * random.randrange(5) / 10
         angle = random.randrange(0, 360, 5)
         vel_vector = Vector2()
         vel_vector.from_polar((absolute_vel, angle))
 
-        vel = cmp.Velocity(vel_vector.x, vel_vector.y)
-        pos = cmp.Position(*position)
-        tag = cmp.Particle(color)
+        particle_pool.spawn(position, vel_vector, color)
 
-        world.create_entity(vel, pos, tag)
+
+def _new_particle(position: tuple[int, int], vel_vector: Vector2, color: Color) -> tuple:
+    return cmp.Velocity(vel_vector.x, vel_vector.y), cmp.Position(*position), cmp.Particle(color)
+
+
+def _reset_particle(components: tuple, position: tuple[int, int], vel_vector: Vector2, color: Color):
+    vel, pos, tag = components
+    vel.reset(vel_vector.x, vel_vector.y)
+    pos.reset(*position)
+    tag.color = color
@@ -1,5 +1,5 @@
 from yazelc import zesper
-from yazelc.components import Renderable, Animation, Position, Weapon, HitBox
+from yazelc.components import Renderable, Animation, Position, Weapon, HitBox, CollisionLayer
 from yazelc.config import C_RED
 from yazelc.event.events import BombExplosionEvent, ExplosionEvent
 
@@ -14,6 +14,7 @@ BOMB_RECOIL_VELOCITY = 2
 BOMB_EXPLOSION_PARTICLES = 60
 BOMB_EXPLOSION_DELAY_TIME = 100
 BOMB_EXPLOSION_COLOR = C_RED
+BOMB_COLLISION_MASK = CollisionLayer.PLAYER | CollisionLayer.ENEMY | CollisionLayer.DEFAULT
 
 
 def create_bomb(position: Position, world: zesper.World):
@@ -36,7 +37,7 @@ def create_bomb(position: Position, world: zesper.World):
 
 
 def add_weapon_component_to_bomb(bomb_entity_id: int, world: zesper.World):
-    hitbox = HitBox(0, 0, BOMB_RANGE * 2, BOMB_RANGE * 2)
+    hitbox = HitBox(0, 0, BOMB_RANGE * 2, BOMB_RANGE * 2, category=CollisionLayer.BOMB, mask=BOMB_COLLISION_MASK)
     position = world.component_for_entity(bomb_entity_id, Position)
     x_center = position.x + BOMB_SPRITE_WIDTH // 2
     y_center = position.y + BOMB_SPRITE_WIDTH // 2
@@ -1,25 +1,535 @@
 """ Module extends the esper package"""
-from typing import TypeVar, Optional, Union, Type
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import TypeVar, Optional, Union, Type, Callable, Any
 
 import esper
 
 from yazelc.event.event_queue import EventQueue
 from yazelc.resource_manager import ResourceManager
+from yazelc.utils.profiler import FrameProfiler
 
 C = TypeVar('C')
 C_alt = TypeVar('C_alt')  # alternative component
+T = TypeVar('T')
+
+ComponentListener = Callable[[int, Any], None]
+
+
+class Archetype:
+    """
+    Table of all the entities sharing the same set of component types (signature). Components are stored in one column
+    (list) per type, and the rows of all columns are aligned with the list of entities. The mask has the bits of the
+    component types of the signature set
+    """
+
+    def __init__(self, signature: frozenset[type], mask: int):
+        self.signature = signature
+        self.mask = mask
+        self.entities: list[int] = []
+        self.columns: dict[type, list] = {component_type: [] for component_type in signature}
+        self.rows: dict[int, int] = {}  # Row of each entity
+        self.queries: set[tuple[type, ...]] = set()  # Cached queries whose result includes the table
+
+    def add(self, entity: int, components: dict[type, Any]):
+        self.rows[entity] = len(self.entities)
+        self.entities.append(entity)
+        for component_type, column in self.columns.items():
+            column.append(components[component_type])
+
+    def remove(self, entity: int):
+        """ Moves the last row into the one of the removed entity to keep the table contiguous """
+        row = self.rows.pop(entity)
+        last_entity = self.entities.pop()
+        if last_entity != entity:
+            self.entities[row] = last_entity
+            self.rows[last_entity] = row
+            for column in self.columns.values():
+                column[row] = column.pop()
+        else:
+            for column in self.columns.values():
+                column.pop()
+
+    def replace(self, entity: int, component_type: type, component_instance: Any):
+        self.columns[component_type][self.rows[entity]] = component_instance
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+
+class CommandBuffer:
+    """
+    Structural changes (entity creation or deletion and component addition or removal) recorded while iterating over
+    queries and applied all together at the next sync point of the world, i.e., before the processors run and after
+    each of them. Entities created through the buffer get their id right away. Commands on entities deleted in the
+    meantime and removals of missing components are skipped
+
+    Commands are grouped by entity, so each entity moves only once, straight to the archetype of its final set of
+    components (later commands on the same component type win). A buffered deletion discards the other changes of the
+    entity, which is then deleted as usual, i.e., at the start of the next frame such that the events sent during the
+    current one can still refer to it
+    """
+    _CREATE, _DELETE, _ADD, _REMOVE = range(4)
+
+    def __init__(self, world: 'World'):
+        self._world = world
+        self._commands: list[tuple[int, int, Any]] = []
+
+    def create_entity(self, *components: C) -> int:
+        entity = self._world.reserve_entity()
+        self._commands.append((self._CREATE, entity, components))
+        return entity
+
+    def delete_entity(self, entity: int):
+        self._commands.append((self._DELETE, entity, None))
+
+    def add_component(self, entity: int, component_instance: C, type_alias: Optional[Type[C]] = None):
+        self._commands.append((self._ADD, entity, (component_instance, type_alias)))
+
+    def remove_component(self, entity: int, component_type: Type[C]):
+        self._commands.append((self._REMOVE, entity, component_type))
+
+    def flush(self) -> int:
+        """ Applies the recorded commands and returns how many there were """
+        commands, self._commands = self._commands, []
+        # Created components, deletion flag and component changes (None for a removal) of each entity
+        entity_commands: dict[int, list] = {}
+        for command, entity, argument in commands:
+            if (commands_of_entity := entity_commands.get(entity)) is None:
+                commands_of_entity = entity_commands[entity] = [None, False, {}]
+            if command == self._CREATE:
+                commands_of_entity[0] = argument
+            elif command == self._DELETE:
+                commands_of_entity[1] = True
+            elif command == self._ADD:
+                component_instance, type_alias = argument
+                commands_of_entity[2][type_alias or type(component_instance)] = component_instance
+            else:
+                commands_of_entity[2][argument] = None
+
+        world = self._world
+        for entity, (created_components, deleted, changes) in entity_commands.items():
+            if created_components is not None:
+                components = {type(component_instance): component_instance for component_instance in created_components}
+                if not deleted:
+                    for component_type, component_instance in changes.items():
+                        if component_instance is None:
+                            components.pop(component_type, None)
+                        else:
+                            components[component_type] = component_instance
+                world._insert_components(entity, components)
+            elif not world.entity_exists(entity):
+                continue
+            elif not deleted and changes:
+                world._change_components(entity, changes)
+            if deleted:
+                world.delete_entity(entity)
+        return len(commands)
+
+    def clear(self):
+        self._commands.clear()
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+
+class EntityPool:
+    """
+    Recycles the ids and component instances of a kind of short-lived entity (particles, projectiles, etc.). The create
+    function builds the components of a new entity from the spawn arguments, while the reset function reinitializes the
+    components of a recycled one, i.e., reset(components, *args).
+
+    Pooled entities are deleted as any other. Once the world has actually removed one, its id and the components it was
+    spawned with are handed back to the pool, so an id is never reused while something could still refer to the old
+    entity. At most max_size entities are kept for reuse
+    """
+    MAX_SIZE = 256
+
+    def __init__(self, world: 'World', create: Callable[..., tuple], reset: Callable[..., None],
+                 max_size: int = MAX_SIZE):
+        self._world = world
+        self._create = create
+        self._reset = reset
+        self.max_size = max_size
+        self._free: list[tuple[int, tuple]] = []
+
+    def spawn(self, *args) -> int:
+        if self._free:
+            entity, components = self._free.pop()
+            self._reset(components, *args)
+            self._world.insert_entity(entity, *components)
+        else:
+            components = self._create(*args)
+            entity = self._world.create_entity(*components)
+        self._world._pooled_entities[entity] = (self, components)
+        return entity
+
+    def recycle(self, entity: int, components: tuple):
+        if len(self._free) < self.max_size:
+            self._free.append((entity, components))
+
+    def clear(self):
+        self._free.clear()
+
+    def __len__(self) -> int:
+        """ Number of entities ready to be reused """
+        return len(self._free)
 
 
 class World(esper.World):
     """
     Adds resource management and event queue reference to be used by systems.
     Additional helpful methods are included
+
+    Systems that keep their own index of some component type (e.g., a spatial index of hitboxes) can register
+    listeners that are called whenever a component of that type is added to or removed from an entity
+
+    Components are stored in archetypes, i.e., tables grouping the entities with the same set of component types, next
+    to the usual per entity dictionaries used for random access. Queries iterate only the tables of the archetypes
+    having all the requested types. A structural change (adding or removing a component or an entity) moves the entity
+    between two tables and only invalidates the cached queries that included one of them. Batches of entities, e.g., the
+    objects of a map, should be created all at once with create_entities (or from a prefab) instead of adding their
+    components one by one, which moves each entity through one archetype per added component
+
+    Each component type gets a bit on first use, and every entity has the mask of the bits of its component types.
+    Signature checks, e.g., whether an entity has some set of components, are then bitwise operations on the masks
+
+    Components can also be disabled, which hides the entity from the queries of that type without a structural change,
+    i.e., without invalidating any cached query. The component can still be accessed directly (component_for_entity,
+    try_component, etc.) and listeners are not notified. Adding the component again (or replacing it) enables it. Queries
+    can include the disabled components too, e.g., to index all of them
+
+    Processors that change the structure of the world while iterating over a query should record the changes on the
+    command buffer instead. The number of commands applied during the last call to process is kept for profiling
+
+    Profiling records the time spent by each processor and the size of each query on every frame. While it is disabled
+    the regular (not instrumented) methods are used so it costs nothing
+
+    Processors are scheduled according to their run interval and the ones whose process does nothing are skipped (see
+    Processor). Simulation steps are counted on each call to process (or simulate) and displayed frames on each call to
+    process (or render), such that the processors presenting the state are scheduled by the frames actually displayed
+
+    On a fixed timestep the simulation processors run on each step (simulate) while the ones presenting the state, e.g.,
+    the rendering, run once per displayed frame (render) with the interpolation between the last two steps
+
+    Short-lived entities of the same kind can be spawned from an entity pool (see EntityPool), which reuses the ids and
+    component instances of the deleted ones
     """
 
     def __init__(self, resource_manager: ResourceManager, event_queue: EventQueue):
         super().__init__()
         self.resource_manager = resource_manager
         self.event_queue = event_queue
+        self._component_listeners: dict[type, list[tuple[ComponentListener, ComponentListener]]] = defaultdict(list)
+        self._archetypes: dict[frozenset[type], Archetype] = {}
+        self._archetype_of_entity: dict[int, Archetype] = {}
+        self._component_bits: dict[type, int] = {}
+        self._entity_masks: dict[int, int] = {}
+        self._query_masks: dict[tuple[type, ...], int] = {}
+        self._disabled_masks: dict[int, int] = {}  # Bits of the disabled components of each entity
+        self._disabled_counts: dict[int, int] = {}  # Number of disabled components of each type bit
+        self._disabled_types = 0  # Bits of the types with at least a disabled component
+        self._query_archetypes: dict[tuple[type, ...], list[Archetype]] = {}  # Archetypes matching each query
+        self.commands = CommandBuffer(self)
+        self.flushed_commands = 0
+        self.profiler: Optional[FrameProfiler] = None
+        self.frame_count = 0
+        self.displayed_frame_count = 0
+        self.interpolation = 1.0  # Fraction of the simulation step elapsed since the last one was run
+        self._entity_pools: dict[str, EntityPool] = {}
+        self._pooled_entities: dict[int, tuple[EntityPool, tuple]] = {}  # Pool and spawned components of each entity
+
+    def add_component_listener(self, component_type: Type[C], on_added: Callable[[int, C], None],
+                               on_removed: Callable[[int, C], None]):
+        """ Calls on_added/on_removed with the entity and the component instance on each structural change of the type """
+        self._component_listeners[component_type].append((on_added, on_removed))
+
+    def remove_component_listener(self, component_type: Type[C], on_added: Callable[[int, C], None],
+                                  on_removed: Callable[[int, C], None]):
+        listeners = self._component_listeners.get(component_type, [])
+        if (on_added, on_removed) in listeners:
+            listeners.remove((on_added, on_removed))
+
+    def create_entity(self, *components: C) -> int:
+        entity = self.reserve_entity()
+        self.insert_entity(entity, *components)
+        return entity
+
+    def reserve_entity(self) -> int:
+        """ Id for a new entity which is only added to the world with insert_entity """
+        self._next_entity_id += 1
+        return self._next_entity_id
+
+    def get_entity_pool(self, kind: str, create: Callable[..., tuple], reset: Callable[..., None]) -> EntityPool:
+        """ Pool of the kind of entity, which is created on first use """
+        try:
+            return self._entity_pools[kind]
+        except KeyError:
+            return self._entity_pools.setdefault(kind, EntityPool(self, create, reset))
+
+    def insert_entity(self, entity: int, *components: C):
+        self._insert_components(entity, {type(component_instance): component_instance for component_instance in components})
+
+    def _insert_components(self, entity: int, entity_components: dict[type, Any]):
+        self._entities[entity] = entity_components
+        self._move_entity(entity, None, self._get_archetype(frozenset(entity_components)))
+        for component_type, component_instance in entity_components.items():
+            self._notify_added(entity, component_type, component_instance)
+
+    def create_entities(self, components_batch: Iterable[tuple]) -> list[int]:
+        """
+        Creates an entity for each tuple of components in one pass. The rows of each archetype are appended together, so
+        the cached queries are invalidated once per archetype instead of once per entity
+        """
+        entities = []
+        filled_archetypes = set()
+        for components in components_batch:
+            entity = self.reserve_entity()
+            entity_components = self._entities[entity] = {type(component_instance): component_instance
+                                                          for component_instance in components}
+            archetype = self._get_archetype(frozenset(entity_components))
+            archetype.add(entity, entity_components)
+            self._archetype_of_entity[entity] = archetype
+            self._entity_masks[entity] = archetype.mask
+            filled_archetypes.add(archetype)
+            entities.append(entity)
+
+        for archetype in filled_archetypes:
+            self._invalidate_queries(archetype)
+        if self._component_listeners:
+            for entity in entities:
+                for component_type, component_instance in self._entities[entity].items():
+                    self._notify_added(entity, component_type, component_instance)
+        return entities
+
+    def create_entities_from_prefab(self, prefab: Callable[..., tuple], rows: Iterable[tuple]) -> list[int]:
+        """ Creates an entity with the components returned by the prefab function for each row of arguments """
+        return self.create_entities(prefab(*row) for row in rows)
+
+    def add_component(self, entity: int, component_instance: C, type_alias: Optional[Type[C]] = None) -> None:
+        component_type = type_alias or type(component_instance)
+        entity_components = self._entities[entity]
+        archetype = self._archetype_of_entity[entity]
+        if component_type in entity_components:  # Replacing a component does not change the archetype
+            if component_type in self._component_listeners:
+                self._notify_removed(entity, component_type, entity_components[component_type])
+            entity_components[component_type] = component_instance
+            archetype.replace(entity, component_type, component_instance)
+            self._invalidate_queries(archetype)
+        else:
+            entity_components[component_type] = component_instance
+            self._move_entity(entity, archetype, self._get_archetype(archetype.signature | {component_type}))
+        if self._disabled_types:
+            self._enable_bits(entity, self.component_mask(component_type))
+        self._notify_added(entity, component_type, component_instance)
+
+    def remove_component(self, entity: int, component_type: Type[C]) -> C:
+        component_instance = self._entities[entity].pop(component_type)
+        archetype = self._archetype_of_entity[entity]
+        self._move_entity(entity, archetype, self._get_archetype(archetype.signature - {component_type}))
+        if self._disabled_types:
+            self._enable_bits(entity, self.component_mask(component_type))
+        self._notify_removed(entity, component_type, component_instance)
+        return component_instance
+
+    def _change_components(self, entity: int, changes: dict[type, Any]):
+        """ Adds, replaces or (for None) removes the components of the entity with a single archetype move """
+        entity_components = self._entities[entity]
+        archetype = self._archetype_of_entity[entity]
+        removed_components = {component_type: entity_components.pop(component_type) for component_type in changes
+                              if component_type in entity_components}  # Also the replaced ones
+        added_components = {component_type: component_instance for component_type, component_instance in changes.items()
+                            if component_instance is not None}
+        if not removed_components and not added_components:  # Only removals of missing components
+            return
+        entity_components.update(added_components)
+        if archetype.signature == entity_components.keys():  # Only replacements
+            for component_type, component_instance in added_components.items():
+                archetype.replace(entity, component_type, component_instance)
+            self._invalidate_queries(archetype)
+        else:
+            self._move_entity(entity, archetype, self._get_archetype(frozenset(entity_components)))
+        if self._disabled_types:
+            self._enable_bits(entity, self.component_mask(*changes))
+        for component_type, component_instance in removed_components.items():
+            self._notify_removed(entity, component_type, component_instance)
+        for component_type, component_instance in added_components.items():
+            self._notify_added(entity, component_type, component_instance)
+
+    def disable_component(self, entity: int, component_type: Type[C]):
+        if component_type not in self._entities[entity]:
+            raise KeyError(component_type)
+        bit = self.component_mask(component_type)
+        disabled_mask = self._disabled_masks.get(entity, 0)
+        if not disabled_mask & bit:
+            self._disabled_masks[entity] = disabled_mask | bit
+            self._disabled_counts[bit] = self._disabled_counts.get(bit, 0) + 1
+            self._disabled_types |= bit
+
+    def enable_component(self, entity: int, component_type: Type[C]):
+        self._enable_bits(entity, self.component_mask(component_type))
+
+    def is_enabled(self, entity: int, component_type: Type[C]) -> bool:
+        return not self._disabled_masks.get(entity, 0) & self.component_mask(component_type)
+
+    def get_disabled_mask(self, entity: int) -> int:
+        return self._disabled_masks.get(entity, 0)
+
+    def any_disabled(self, mask: int) -> bool:
+        """ Whether some entity has a disabled component of the types of the mask """
+        return bool(self._disabled_types & mask)
+
+    def delete_entity(self, entity: int, immediate: bool = False) -> None:
+        if immediate:
+            self._notify_entity_removed(entity)
+            self._move_entity(entity, self._archetype_of_entity[entity], None)
+            del self._entities[entity]
+            self._enable_bits(entity, -1)
+            self._recycle_entity(entity)
+        else:
+            self._dead_entities.add(entity)
+
+    def process(self, *args, **kwargs):
+        self.frame_count += 1
+        self.displayed_frame_count += 1
+        self.interpolation = 1.0
+        self.flushed_commands = self.commands.flush()
+        self._clear_dead_entities()
+        self._process(self._scheduled(self._processors), *args, **kwargs)
+
+    def simulate(self, *args, **kwargs):
+        """ Same as process but only with the simulation processors """
+        self.frame_count += 1
+        self.flushed_commands = self.commands.flush()
+        self._clear_dead_entities()
+        self._process(self._scheduled([processor for processor in self._processors if processor.simulated]),
+                      *args, **kwargs)
+
+    def render(self, interpolation: float, *args, **kwargs):
+        """ Runs the processors presenting the state between the last two simulation steps """
+        self.displayed_frame_count += 1
+        self.interpolation = interpolation
+        self._process(self._scheduled([processor for processor in self._processors if not processor.simulated]),
+                      *args, **kwargs)
+
+    def _scheduled(self, processors: list['Processor']) -> list['Processor']:
+        """ Processors due on the current frame """
+        return [processor for processor in processors
+                if not processor.no_op and self.processor_frame(processor) % processor.interval == 0]
+
+    def processor_frame(self, processor: 'Processor') -> int:
+        """ Current simulation step or, for the processors presenting the state, current displayed frame """
+        return self.frame_count if processor.simulated else self.displayed_frame_count
+
+    def _process(self, processors: list[esper.Processor], *args, **kwargs):
+        for processor in processors:
+            processor.process(*args, **kwargs)
+            self.flushed_commands += self.commands.flush()
+
+    def enable_profiling(self, n_frames: int = FrameProfiler.N_FRAMES):
+        """ Swaps in the instrumented process and query methods """
+        self.profiler = FrameProfiler(n_frames)
+        self._process = self._profiled_process
+        self.get_component = self._profiled_get_component
+        self.get_components = self._profiled_get_components
+
+    def disable_profiling(self):
+        self.profiler = None
+        for instrumented_method in ('_process', 'get_component', 'get_components'):
+            self.__dict__.pop(instrumented_method, None)
+
+    def _profiled_process(self, processors: list[esper.Processor], *args, **kwargs):
+        profiler = self.profiler
+        for processor in processors:
+            start_time = time.perf_counter()
+            processor.process(*args, **kwargs)
+            self.flushed_commands += self.commands.flush()
+            profiler.record_time(type(processor).__name__, time.perf_counter() - start_time)
+        profiler.end_frame()
+
+    def _profiled_get_component(self, component_type: Type[C], include_disabled: bool = False) -> list[tuple[int, C]]:
+        result = World.get_component(self, component_type, include_disabled)
+        self.profiler.record_query((component_type,), len(result))
+        return result
+
+    def _profiled_get_components(self, *component_types: Type[Any], include_disabled: bool = False) \
+            -> list[tuple[int, tuple[Any, ...]]]:
+        result = World.get_components(self, *component_types, include_disabled=include_disabled)
+        self.profiler.record_query(component_types, len(result))
+        return result
+
+    def _clear_dead_entities(self):
+        for entity in self._dead_entities:
+            self._notify_entity_removed(entity)
+            self._move_entity(entity, self._archetype_of_entity[entity], None)
+            del self._entities[entity]
+            self._enable_bits(entity, -1)
+            self._recycle_entity(entity)
+        self._dead_entities.clear()
+
+    def _recycle_entity(self, entity: int):
+        if self._pooled_entities and (pool_entry := self._pooled_entities.pop(entity, None)):
+            pool, components = pool_entry
+            pool.recycle(entity, components)
+
+    def get_component(self, component_type: Type[C], include_disabled: bool = False) -> list[tuple[int, C]]:
+        try:
+            result = self._get_component_cache[component_type]
+        except KeyError:
+            result = []
+            for archetype in self._get_matching_archetypes((component_type,)):
+                archetype.queries.add((component_type,))
+                result.extend(zip(archetype.entities, archetype.columns[component_type]))
+            result = self._get_component_cache.setdefault(component_type, result)
+        if self._disabled_types and not include_disabled:
+            return self._without_disabled(result, self._query_masks[(component_type,)])
+        return result
+
+    def get_components(self, *component_types: Type[Any], include_disabled: bool = False) \
+            -> list[tuple[int, tuple[Any, ...]]]:
+        try:
+            result = self._get_components_cache[component_types]
+        except KeyError:
+            result = []
+            for archetype in self._get_matching_archetypes(component_types):
+                archetype.queries.add(component_types)
+                result.extend(zip(archetype.entities, zip(*(archetype.columns[ct] for ct in component_types))))
+            result = self._get_components_cache.setdefault(component_types, result)
+        if self._disabled_types and not include_disabled:
+            return self._without_disabled(result, self._query_masks[component_types])
+        return result
+
+    def _without_disabled(self, result: list[tuple[int, Any]], query_mask: int) -> list[tuple[int, Any]]:
+        """ Rows of the cached query result whose requested components are all enabled """
+        if not self._disabled_types & query_mask:
+            return result
+        disabled_masks = self._disabled_masks
+        return [row for row in result if not disabled_masks.get(row[0], 0) & query_mask]
+
+    def get_signature(self, entity: int) -> frozenset[type]:
+        """ Set of component types of the entity. It is shared by all entities of the archetype (cheap dictionary key) """
+        return self._archetype_of_entity[entity].signature
+
+    def component_mask(self, *component_types: Type[Any]) -> int:
+        """ Mask with the bits of the component types """
+        mask = 0
+        for component_type in component_types:
+            try:
+                mask |= self._component_bits[component_type]
+            except KeyError:
+                mask |= self._component_bits.setdefault(component_type, 1 << len(self._component_bits))
+        return mask
+
+    def get_mask(self, entity: int) -> int:
+        return self._entity_masks[entity]
+
+    def has_mask(self, entity: int, mask: int) -> bool:
+        """ Whether the entity has all the component types of the mask """
+        return self._entity_masks[entity] & mask == mask
+
+    def has_components(self, entity: int, *component_types: Type[Any]) -> bool:
+        return self.has_mask(entity, self.component_mask(*component_types))
 
     def try_pair_signature(self, ent_1: int, ent_2: int, component_type_1: Type[C], component_type_2: Type[C_alt]) \
             -> Union[tuple[int, C, int, C_alt], tuple[int, C_alt, int, C], None]:
@@ -27,16 +537,13 @@ class World(esper.World):
         Checks if the pair have each the corresponding input pair components in the two possible permutations.
         If found returns the entities paired with their respective components
         """
-        component_1_1 = self.try_component(ent_1, component_type_1)
-        component_2_2 = self.try_component(ent_2, component_type_2)
-
-        component_1_2 = self.try_component(ent_1, component_type_2)
-        component_2_1 = self.try_component(ent_2, component_type_1)
+        bit_1, bit_2 = self.component_mask(component_type_1), self.component_mask(component_type_2)
+        mask_1, mask_2 = self._entity_masks[ent_1], self._entity_masks[ent_2]
 
-        if component_1_1 and component_2_2:
-            return ent_1, component_1_1, ent_2, component_2_2
-        elif component_1_2 and component_2_1:
-            return ent_2, component_2_1, ent_1, component_1_2
+        if mask_1 & bit_1 and mask_2 & bit_2:
+            return ent_1, self._entities[ent_1][component_type_1], ent_2, self._entities[ent_2][component_type_2]
+        elif mask_1 & bit_2 and mask_2 & bit_1:
+            return ent_2, self._entities[ent_2][component_type_1], ent_1, self._entities[ent_1][component_type_2]
         else:
             return None
 
@@ -44,12 +551,11 @@ class World(esper.World):
         """
         Same as above but only checked on a single entity
         """
-        component_1 = self.try_component(ent_1, component_type)
-        component_2 = self.try_component(ent_2, component_type)
-        if component_1:
-            return ent_1, component_1, ent_2
-        elif component_2:
-            return ent_2, component_2, ent_1
+        bit = self.component_mask(component_type)
+        if self._entity_masks[ent_1] & bit:
+            return ent_1, self._entities[ent_1][component_type], ent_2
+        elif self._entity_masks[ent_2] & bit:
+            return ent_2, self._entities[ent_2][component_type], ent_1
         else:
             return None
 
@@ -66,7 +572,124 @@ class World(esper.World):
     def clear_database(self) -> None:
         super().clear_database()
         self.clear_processors()
+        self._component_listeners.clear()  # Listeners belong to the processors that were just cleared
+        self.commands.clear()
+        self._archetypes.clear()
+        self._archetype_of_entity.clear()
+        self._entity_masks.clear()
+        self._disabled_masks.clear()
+        self._disabled_counts.clear()
+        self._disabled_types = 0
+        self._query_archetypes.clear()
+        self._query_masks.clear()
+        self._entity_pools.clear()  # Entity ids start again from zero
+        self._pooled_entities.clear()
+
+    def _get_archetype(self, signature: frozenset[type]) -> Archetype:
+        try:
+            return self._archetypes[signature]
+        except KeyError:
+            archetype = self._archetypes[signature] = Archetype(signature, self.component_mask(*signature))
+            for component_types, archetypes in self._query_archetypes.items():
+                query_mask = self._query_masks[component_types]
+                if archetype.mask & query_mask == query_mask:
+                    archetypes.append(archetype)
+                    archetype.queries.add(component_types)  # The cached result has to be dropped once the table fills
+            return archetype
+
+    def _get_matching_archetypes(self, component_types: tuple[type, ...]) -> list[Archetype]:
+        try:
+            return self._query_archetypes[component_types]
+        except KeyError:
+            query_mask = self._query_masks[component_types] = self.component_mask(*component_types)
+            matching_archetypes = [archetype for archetype in self._archetypes.values()
+                                   if archetype.mask & query_mask == query_mask]
+            return self._query_archetypes.setdefault(component_types, matching_archetypes)
+
+    def _enable_bits(self, entity: int, mask: int):
+        """ Enables the components of the entity with the bits of the mask (-1 for all of them) """
+        disabled_mask = self._disabled_masks.get(entity, 0)
+        enabled_bits = disabled_mask & mask
+        if not enabled_bits:
+            return
+        if disabled_mask & ~mask:
+            self._disabled_masks[entity] = disabled_mask & ~mask
+        else:
+            del self._disabled_masks[entity]
+        while enabled_bits:
+            bit = enabled_bits & -enabled_bits  # Lowest set bit
+            enabled_bits ^= bit
+            self._disabled_counts[bit] -= 1
+            if not self._disabled_counts[bit]:
+                del self._disabled_counts[bit]
+                self._disabled_types &= ~bit
+
+    def _move_entity(self, entity: int, source: Optional[Archetype], target: Optional[Archetype]):
+        """ Moves the entity row between archetypes (None when it is created or deleted) """
+        if source is not None:
+            source.remove(entity)
+            self._invalidate_queries(source)
+        if target is not None:
+            target.add(entity, self._entities[entity])
+            self._invalidate_queries(target)
+            self._archetype_of_entity[entity] = target
+            self._entity_masks[entity] = target.mask
+        else:
+            del self._archetype_of_entity[entity]
+            del self._entity_masks[entity]
+
+    def _invalidate_queries(self, archetype: Archetype):
+        """ Drops the cached query results that include the archetype """
+        for query in archetype.queries:
+            if len(query) == 1:
+                self._get_component_cache.pop(query[0], None)
+            self._get_components_cache.pop(query, None)
+        archetype.queries.clear()
+
+    def _notify_added(self, entity: int, component_type: type, component_instance: Any):
+        for on_added, _ in self._component_listeners.get(component_type, ()):
+            on_added(entity, component_instance)
+
+    def _notify_removed(self, entity: int, component_type: type, component_instance: Any):
+        for _, on_removed in self._component_listeners.get(component_type, ()):
+            on_removed(entity, component_instance)
+
+    def _notify_entity_removed(self, entity: int):
+        if not self._component_listeners:
+            return
+        for component_type, component_instance in self._entities[entity].items():
+            self._notify_removed(entity, component_type, component_instance)
 
 
 class Processor(esper.Processor):  # noqa
+    """
+    Besides running on every frame, a processor can run only once every interval frames, or spread the entities of its
+    queries across several frames by processing on each run only a round-robin slice of them (see sliced). In both cases
+    frames_per_run frames go by between two runs over the same entity, e.g., to tick its timers accordingly. Slices are
+    taken from the current query result, so an entity can occasionally wait one run more (or less) after structural
+    changes
+
+    Processors not defining process, e.g., the ones only handling events, are never run
+    """
     world: World
+    simulated = True  # Processors presenting the state (e.g. rendering) run once per displayed frame instead
+    interval = 1
+    slices = 1
+
+    def process(self, *args, **kwargs):
+        pass
+
+    @property
+    def no_op(self) -> bool:
+        return type(self).process is Processor.process
+
+    @property
+    def frames_per_run(self) -> int:
+        return self.interval * self.slices
+
+    def sliced(self, query_result: list[T]) -> list[T]:
+        """ Part of the query result to process on the current run """
+        if self.slices == 1:
+            return query_result
+        return query_result[self.world.processor_frame(self) // self.interval % self.slices::self.slices]
+